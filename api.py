@@ -0,0 +1,281 @@
+"""Local HTTP API for kiosks and gate scanners.
+
+An ASGI app (Starlette) over the same storage and card rendering code as the
+Streamlit UI, with one shared store per process:
+
+    POST /attendance          {"unique_id": "AT-001"} or {"payload": "<QR text>"}
+    GET  /employees/{id}      employee record as JSON
+    GET  /cards/{id}.png      rendered card image
+
+Repeat scans of a card inside the debounce window are acknowledged but not
+stored, and concurrent punches are coalesced into a single SQLite
+transaction. Set
+``EMPLOYEE_API_TOKEN`` to require ``Authorization: Bearer <token>``.
+
+Run locally:
+
+    python api.py --host 127.0.0.1 --port 8000
+"""
+import argparse
+import asyncio
+import hmac
+import logging
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import card_renderer
+import qr_payload
+from attendance_ingest import DEBOUNCE_SECONDS, AttendanceIngestor
+from card_cache import RenderedCardCache
+from storage import AttendanceStore, EmployeeStore
+
+
+logger = logging.getLogger(__name__)
+
+TOKEN_ENV_VAR = 'EMPLOYEE_API_TOKEN'
+
+
+class AttendanceBatcher:
+    """Coalesce concurrent punches into one SQLite transaction.
+
+    Each request waits until its batch is committed, so a 201 response still
+    means the punch is durable. A batch is flushed once ``max_batch`` punches
+    are queued or ``max_delay`` seconds after its first punch.
+    """
+
+    def __init__(self, store, max_batch=256, max_delay=0.005):
+        self.store = store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.punches = 0
+        self._queue = None
+        self._task = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush queued punches and stop the writer"""
+        await self._queue.put(None)
+        await self._task
+
+    async def submit(self, unique_id, name, timestamp, kind=None):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((unique_id, name, timestamp, kind), future))
+        await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        try:
+            await run_in_threadpool(self.store.append_many, [record for record, _ in batch])
+        except Exception as e:
+            logger.exception("Failed to write %d punches", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.punches += len(batch)
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'punches': self.punches,
+            'queued': self._queue.qsize() if self._queue else 0,
+        }
+
+
+def _json_value(value):
+    """Plain JSON value for a DataFrame cell"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _error(status, message):
+    return JSONResponse({'error': message}, status_code=status)
+
+
+def create_app(employees_path='data/employees.pkl', db_path='data/attendance.db',
+               card_cache_dir='data/card_cache', logo_path=card_renderer.DEFAULT_LOGO_PATH,
+               token=None, debounce=DEBOUNCE_SECONDS):
+    """Build the ASGI app over the given data files"""
+    token = token if token is not None else os.environ.get(TOKEN_ENV_VAR)
+    employees = EmployeeStore(employees_path)
+
+    def shift_of(unique_id):
+        return (employees.get(unique_id) or {}).get('Shift')
+
+    store = AttendanceStore(db_path, shift_of=shift_of)
+    store.migrate_from_pickle(os.path.splitext(db_path)[0] + '.pkl')
+    card_cache = RenderedCardCache(card_cache_dir)
+    batcher = AttendanceBatcher(store)
+    ingestor = AttendanceIngestor(store, shift_of=shift_of, window=debounce)
+
+    def authorized(request):
+        if not token:
+            return True
+        header = request.headers.get('authorization', '')
+        return hmac.compare_digest(header, f"Bearer {token}")
+
+    def lookup(unique_id):
+        employees.refresh()
+        return employees.get(unique_id)
+
+    async def post_attendance(request):
+        """Record a punch by Unique ID or scanned QR payload"""
+        if not authorized(request):
+            return _error(401, "Missing or invalid API token")
+        try:
+            body = await request.json()
+        except ValueError:
+            return _error(400, "Request body must be JSON")
+        if not isinstance(body, dict):
+            return _error(400, "Request body must be a JSON object")
+
+        unique_id = body.get('unique_id')
+        if not unique_id and body.get('payload'):
+            try:
+                unique_id = qr_payload.parse_payload(str(body['payload']))
+            except qr_payload.InvalidPayload as e:
+                return _error(400, str(e))
+        if not unique_id:
+            return _error(400, "Provide unique_id or payload")
+
+        employee = await run_in_threadpool(lookup, str(unique_id).strip())
+        if employee is None:
+            return _error(404, f"No employee with Unique ID {unique_id}")
+
+        # Repeat reads of the same card are answered without a write
+        punch, = ingestor.classify_many([(employee['Unique ID'], employee['Name'], datetime.now())])
+        if punch.accepted:
+            try:
+                await batcher.submit(punch.unique_id, punch.name, punch.timestamp, punch.kind)
+            except Exception:
+                # Not stored, so a retry must not be treated as a repeat scan
+                ingestor.release([punch])
+                raise
+            ingestor.confirm([punch])
+        return JSONResponse({
+            'unique_id': punch.unique_id,
+            'name': punch.name,
+            'timestamp': punch.timestamp.isoformat(sep=' '),
+            'type': punch.kind,
+            'accepted': punch.accepted,
+        }, status_code=201 if punch.accepted else 200)
+
+    async def get_employee(request):
+        """Employee record without internal file paths"""
+        if not authorized(request):
+            return _error(401, "Missing or invalid API token")
+        employee = await run_in_threadpool(lookup, request.path_params['unique_id'])
+        if employee is None:
+            return _error(404, "Employee not found")
+        return JSONResponse({
+            key: _json_value(value) for key, value in employee.items() if key != 'Photo'
+        })
+
+    async def get_card(request):
+        """Card PNG, served from the shared rendered-card cache"""
+        if not authorized(request):
+            return _error(401, "Missing or invalid API token")
+        employee = await run_in_threadpool(lookup, request.path_params['unique_id'])
+        if employee is None:
+            return _error(404, "Employee not found")
+
+        photo_path = employee.get('Photo')
+        if not (isinstance(photo_path, str) and os.path.exists(photo_path)):
+            photo_path = None
+        logo = logo_path if logo_path and os.path.exists(logo_path) else None
+        data = await run_in_threadpool(card_cache.get_or_render, employee, logo, photo_path)
+        return Response(data, media_type='image/png', headers={
+            'Content-Disposition': f'inline; filename="{card_renderer.card_filename(employee)}"',
+        })
+
+    async def get_stats(request):
+        if not authorized(request):
+            return _error(401, "Missing or invalid API token")
+        return JSONResponse({
+            'attendance_batches': batcher.stats(),
+            'attendance_ingest': ingestor.stats(),
+            'card_cache': card_cache.stats(),
+        })
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await batcher.start()
+        try:
+            yield
+        finally:
+            await batcher.stop()
+            store.close()
+
+    app = Starlette(routes=[
+        Route('/attendance', post_attendance, methods=['POST']),
+        Route('/employees/{unique_id}', get_employee, methods=['GET']),
+        Route('/cards/{unique_id}.png', get_card, methods=['GET']),
+        Route('/stats', get_stats, methods=['GET']),
+    ], lifespan=lifespan)
+    app.state.batcher = batcher
+    app.state.store = store
+    return app
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Alpha Tech attendance and card API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--employees', default='data/employees.pkl',
+                        help="employee data store (default: %(default)s)")
+    parser.add_argument('--db', default='data/attendance.db',
+                        help="attendance store (default: %(default)s)")
+    parser.add_argument('--logo', default=card_renderer.DEFAULT_LOGO_PATH,
+                        help="company logo (default: %(default)s)")
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS,
+                        help="ignore repeat scans of a card within this many seconds")
+    args = parser.parse_args(argv)
+
+    app = create_app(args.employees, args.db, logo_path=args.logo, debounce=args.debounce)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,104 @@
 
 import streamlit as st
-import qrcode
 import pandas as pd
-import numpy as np
-from PIL import Image, ImageDraw, ImageFont
-import io
-import base64
-import hashlib
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 import os
-import pickle
+import tempfile
+import threading
+import atexit
+import multiprocessing
+import assets
+import attendance_analytics
+import card_renderer
+import photo_pipeline
+import profiling
+from card_cache import RenderedCardCache
+from render_queue import DONE, FAILED, RenderQueue
+from attendance_ingest import CHECK_IN, DEBOUNCE_SECONDS, AttendanceIngestor
+from storage import (
+    MAX_AGE, MIN_AGE, ROLES, SHIFTS, AttendanceStore, DuplicateEmployee, EmployeeStore
+)
+
+
+# qr_decoder, sheet_export, attendance_export, employee_import and
+# card_manifest are imported by the methods that use them, so the first
+# page load doesn't pay for them
+
+# How often the attendance tab checks for punches from other sessions
+LIVE_REFRESH_SECONDS = 5
+
+# How often a pending card checks whether its render has finished
+CARD_POLL_SECONDS = 1
+
+# st.download_button keeps the whole file in server memory for the session,
+# so the UI only exports up to this many punches (roughly 10 MB of CSV);
+# larger exports go through `cli.py export-attendance`
+UI_EXPORT_MAX_ROWS = 250_000
+
+# Same for print sheets: about 100 KB of PDF per card, so up to ~50 MB;
+# larger batches go through `cli.py sheets`
+UI_SHEET_MAX_CARDS = 500
+
+
+@st.cache_resource
+def load_assets():
+    """Create the default logo if needed and warm the card assets.
+
+    Fonts, the logo and the card template load on a background thread so
+    the first page renders without waiting for them.
+    """
+    assets.ensure_default_logo()
+    thread = threading.Thread(target=card_renderer.preload, daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource
+def get_attendance_store():
+    """Process-wide attendance store, migrated from the legacy pickle once"""
+    employees = get_employee_store()
+    store = AttendanceStore(
+        'data/attendance.db',
+        shift_of=lambda unique_id: (employees.get(unique_id) or {}).get('Shift')
+    )
+    store.migrate_from_pickle('data/attendance.pkl')
+    return store
+
+
+@st.cache_resource
+def get_employee_store():
+    """Employee data shared by all sessions instead of one copy per session"""
+    return EmployeeStore('data/employees.pkl')
+
+
+@st.cache_resource
+def get_attendance_ingestor():
+    """Debounces repeat scans and labels punches as check-in or check-out"""
+    employees = get_employee_store()
+    return AttendanceIngestor(
+        get_attendance_store(),
+        shift_of=lambda unique_id: (employees.get(unique_id) or {}).get('Shift')
+    )
+
+
+@st.cache_resource
+def get_card_cache():
+    """Rendered card PNGs shared across reruns and sessions"""
+    return RenderedCardCache('data/card_cache')
+
+
+@st.cache_resource
+def get_render_queue():
+    """Background card renders shared by every session"""
+    queue = RenderQueue(get_card_cache(), 'data/render_jobs.db')
+    # Let a render in progress finish and close the job table on shutdown
+    atexit.register(queue.close)
+    return queue
+
 
 class EmployeeCardGenerator:
     def __init__(self):
-        # Initialize session state
-        if 'employees' not in st.session_state:
-            st.session_state.employees = pd.DataFrame(columns=[
-                'Unique ID', 'Name', 'CNIC', 'Age', 'Role', 'City', 'Shift', 'Photo'
-            ])
-        
-        if 'attendance' not in st.session_state:
-            st.session_state.attendance = pd.DataFrame(columns=[
-                'Unique ID', 'Name', 'Date', 'Time', 'Timestamp'
-            ])
-        
         # Set up admin credentials
         self.ADMIN_PASSWORD = 'Haider786'
         
@@ -32,242 +106,369 @@ class EmployeeCardGenerator:
         if not os.path.exists('data'):
             os.makedirs('data')
             
+        # Attendance is kept in an append-only store shared by all sessions
+        self.attendance_store = get_attendance_store()
+        self.attendance_ingestor = get_attendance_ingestor()
+        self.card_cache = get_card_cache()
+        self.render_queue = get_render_queue()
+            
         # Load existing data if available
         self.load_data()
 
+    @property
+    def employees(self):
+        """Indexed employee data shared by all sessions"""
+        return get_employee_store()
+
     def load_data(self):
-        """Load data from disk if available"""
+        """Pick up employees saved by other processes since the last rerun"""
         try:
-            if os.path.exists('data/employees.pkl'):
-                with open('data/employees.pkl', 'rb') as f:
-                    st.session_state.employees = pickle.load(f)
-            
-            if os.path.exists('data/attendance.pkl'):
-                with open('data/attendance.pkl', 'rb') as f:
-                    st.session_state.attendance = pickle.load(f)
+            self.employees.refresh()
         except Exception as e:
             st.error(f"Error loading data: {e}")
 
-    def save_data(self):
-        """Save data to disk"""
-        try:
-            with open('data/employees.pkl', 'wb') as f:
-                pickle.dump(st.session_state.employees, f)
-            
-            with open('data/attendance.pkl', 'wb') as f:
-                pickle.dump(st.session_state.attendance, f)
-        except Exception as e:
-            st.error(f"Error saving data: {e}")
-
-    def generate_unique_id(self):
-        """Generate a unique ID for each employee"""
-        while True:
-            # Generate a unique ID (e.g., AT-001, AT-002)
-            unique_id = f'AT-{len(st.session_state.employees) + 1:03d}'
-            
-            # Check if ID already exists
-            if not st.session_state.employees['Unique ID'].eq(unique_id).any():
-                return unique_id
-
     def generate_qr_code(self, employee_data):
         """Generate QR code with employee information"""
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        # Include Unique ID in QR code data
-        qr_data = "\n".join([f"{key}: {value}" for key, value in employee_data.items()])
-        qr.add_data(qr_data)
-        qr.make(fit=True)
-        
-        qr_img = qr.make_image(fill_color="black", back_color="white")
-        return qr_img
+        return card_renderer.generate_qr_code(employee_data)
 
     def create_employee_card(self, employee_data, logo_path, employee_photo=None):
         """Create a professional employee card"""
-        # Card dimensions
-        card_width, card_height = 1054, 640
-        
-        # Create card background
-        card = Image.new('RGB', (card_width, card_height), color='white')
-        draw = ImageDraw.Draw(card)
-        
-        # Load fonts
+        return card_renderer.create_employee_card(
+            employee_data, logo_path, employee_photo, on_error=st.error
+        )
+
+    def crop_to_aspect(self, image, target_width, target_height):
+        """Crop image to specified aspect ratio and resize"""
+        return card_renderer.crop_to_aspect(image, target_width, target_height)
+
+    def render_card_png(self, employee_data, logo_path, photo_path=None):
+        """Return a card as PNG bytes, reusing the rendered-card cache"""
+        return self.card_cache.get_or_render(
+            employee_data, logo_path, photo_path, on_error=st.error
+        )
+
+    def import_roster(self):
+        """Add every valid row of an uploaded CSV/Excel roster in one write"""
+        import employee_import
+
+        st.caption(
+            "Columns: Name, CNIC, Age, Role, City, Shift. Unique IDs are assigned on import."
+        )
+        roster_file = st.file_uploader("Roster file", type=['csv', 'xlsx'])
+        render_cards = st.checkbox("Render cards in the background after importing", value=True)
+        if roster_file is None or not st.button("Import roster"):
+            return
+
         try:
-            title_font = ImageFont.truetype("arial.ttf", 40)
-            label_font = ImageFont.truetype("arial.ttf", 30)
-            data_font = ImageFont.truetype("arial.ttf", 35)
-        except IOError:
-            # Fallback to default font
-            title_font = ImageFont.load_default()
-            label_font = ImageFont.load_default()
-            data_font = ImageFont.load_default()
-        
-        # Card Design Colors
-        primary_color = (31, 97, 141)  # Dark Blue
-        
-        # Draw header
-        draw.rectangle([0, 0, card_width, 85], fill=primary_color)
-        draw.text((240, 24), "ALPHA TECH EMPLOYEE CARD", 
-                 fill='white', font=title_font)
-        
-        # Company logo - FIXED POSITIONING to appear within the blue header
+            roster = employee_import.read_roster(roster_file)
+            added, rejected = employee_import.import_roster(self.employees, roster)
+        except (RuntimeError, ValueError) as e:
+            st.error(f"Error importing roster: {e}")
+            return
+
+        st.success(f"Added {len(added)} employees")
+        if len(rejected):
+            st.warning(f"Rejected {len(rejected)} rows")
+            st.dataframe(rejected, hide_index=True)
+            st.download_button(
+                "Download rejected rows",
+                data=rejected.to_csv(index=False).encode('utf-8'),
+                file_name="rejected_rows.csv",
+                mime="text/csv"
+            )
+        if added and render_cards:
+            logo_path = "alpha_tech_logo.png" if os.path.exists("alpha_tech_logo.png") else None
+            self.render_queue.submit_many(
+                (employee, logo_path, employee.get('Photo')) for employee in added
+            )
+            st.info(f"Rendering {len(added)} cards in the background")
+
+    def rebuild_stale_cards(self):
+        """Queue renders for every card whose logo, photo, details or QR changed"""
+        import card_manifest
+
+        dry_run = st.checkbox("Dry run (only count stale cards)", value=True)
+        if not st.button("Rebuild stale cards"):
+            return
+        logo_path = "alpha_tech_logo.png" if os.path.exists("alpha_tech_logo.png") else None
+        records = self.employees.to_dataframe().to_dict('records')
+        stale = card_manifest.stale_in_cache(records, logo_path, self.card_cache)
+        if dry_run:
+            st.write(f"{len(stale)} of {len(records)} cards would be rebuilt")
+            return
+        self.render_queue.submit_many(
+            (employee, logo_path, employee.get('Photo')) for employee in stale
+        )
+        st.write(f"Rebuilding {len(stale)} of {len(records)} cards in the background")
+
+    def show_rendered_card(self, job_id, employee, caption, label, key=None):
+        """Show a queued card with its download button, or a placeholder while it renders"""
+        job = self.render_queue.status(job_id)
+        data = self.render_queue.result(job_id) if job and job['status'] == DONE else None
+        if data is not None:
+            st.image(data, caption=caption)
+            st.download_button(
+                label=label,
+                data=data,
+                file_name=card_renderer.card_filename(employee),
+                mime="image/png",
+                key=key
+            )
+        elif job is None:
+            st.warning(f"The card for {employee['Name']} is no longer queued; generate it again")
+        elif job['status'] == FAILED:
+            st.error(f"Error rendering card for {employee['Name']}: {job['error']}")
+        else:
+            st.fragment(self.await_card, run_every=CARD_POLL_SECONDS)(job_id, employee['Name'])
+
+    def await_card(self, job_id, name):
+        """Placeholder that reruns the page once the card has been rendered"""
+        job = self.render_queue.status(job_id)
+        if job is None or job['status'] in (DONE, FAILED):
+            st.rerun()
+        st.info(f"Rendering card for {name}...")
+
+    def render_profiling(self, employees=None):
+        """Per-stage timings collected while profiling is switched on"""
+        enabled = st.checkbox(
+            "Collect render timings", value=profiling.is_enabled(),
+            help=f"Applies to every session; set {profiling.PROFILE_ENV_VAR}=1 to start with it on"
+        )
+        profiling.enable(enabled)
+
+        timings = profiling.stats()
+        if timings:
+            st.dataframe(pd.DataFrame(timings), hide_index=True)
+        else:
+            st.caption("No timings recorded yet.")
+        if st.button("Reset timings"):
+            profiling.reset()
+            st.rerun()
+
+        # Function-level breakdown of one uncached render
+        if employees is not None and len(employees) and st.button("Profile one card render"):
+            employee = employees.iloc[0]
+            photo_path = employee.get('Photo')
+            if not (isinstance(photo_path, str) and os.path.exists(photo_path)):
+                photo_path = None
+            _, report = profiling.profile_call(
+                lambda: card_renderer.encode_png(card_renderer.create_employee_card(
+                    employee.to_dict(), card_renderer.DEFAULT_LOGO_PATH, photo_path,
+                    on_error=st.error
+                ))
+            )
+            st.code(report)
+
+    def export_print_sheets(self, employees, paper, sheet_format):
+        """Stream cards onto printable pages in a temp file and offer it for download.
+
+        The download button holds the finished file in memory, which is why
+        callers cap the export at UI_SHEET_MAX_CARDS.
+        """
+        import sheet_export
+
+        output_path = os.path.join(tempfile.gettempdir(), f"employee_cards_{uuid.uuid4().hex}.{sheet_format}")
+        progress = st.progress(0.0)
+        total = max(len(employees), 1)
         try:
-            if isinstance(logo_path, str) and os.path.exists(logo_path):
-                logo = Image.open(logo_path)
-            elif hasattr(logo_path, 'read'):
-                logo = Image.open(logo_path)
-            else:
-                # Use default logo if available
-                default_logo_path = "alpha_tech_logo.png"
-                if os.path.exists(default_logo_path):
-                    logo = Image.open(default_logo_path)
-                else:
-                    raise FileNotFoundError("Logo not found")
-                
-            logo = logo.resize((80, 80))
-            card.paste(logo, (50, 2), logo if logo.mode == 'RGBA' else None)
+            cards, pages = sheet_export.export_sheets(
+                (row.to_dict() for _, row in employees.iterrows()),
+                output_path,
+                logo_path="alpha_tech_logo.png" if os.path.exists("alpha_tech_logo.png") else None,
+                paper=paper,
+                progress=lambda done: progress.progress(done / total),
+                on_error=st.error
+            )
+            with open(output_path, 'rb') as f:
+                st.download_button(
+                    label=f"Download {cards} cards on {pages} pages",
+                    data=f,
+                    file_name=f"employee_cards.{sheet_format}",
+                    mime="application/pdf" if sheet_format == "pdf" else "image/tiff"
+                )
         except Exception as e:
-            st.error(f"Error loading logo: {e}")
-        
-        # Employee Photo
+            st.error(f"Error exporting print sheets: {e}")
+        finally:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
+    def attendance_filter_ids(self, employees, selected_ids, selected_shifts):
+        """Unique IDs matching the attendance filters, or None for everyone"""
+        if not selected_ids and not selected_shifts:
+            return None
+        mask = pd.Series(True, index=employees.index)
+        if selected_ids:
+            mask &= employees['Unique ID'].isin(selected_ids)
+        if selected_shifts:
+            mask &= employees['Shift'].isin(selected_shifts)
+        return employees.loc[mask, 'Unique ID'].tolist()
+
+    def export_attendance(self, start, end, unique_ids, export_format):
+        """Stream filtered attendance into a temp file and offer it for download.
+
+        The download button holds the finished file in memory, which is why
+        callers cap the export at UI_EXPORT_MAX_ROWS.
+        """
+        import attendance_export
+
+        extension, mime = attendance_export.EXPORT_FORMATS[export_format]
+        output_path = os.path.join(tempfile.gettempdir(), f"attendance_{uuid.uuid4().hex}{extension}")
+        status = st.empty()
         try:
-            if employee_photo is not None:
-                if isinstance(employee_photo, str) and os.path.exists(employee_photo):
-                    photo = Image.open(employee_photo)
-                elif hasattr(employee_photo, 'read'):
-                    photo = Image.open(employee_photo)
-                else:
-                    raise ValueError("Invalid photo format")
-                    
-                photo = self.crop_to_aspect(photo, 300, 400)
-                card.paste(photo, (card_width-350, 150))
-            else:
-                draw.rectangle([card_width-350, 150, card_width-50, 450], 
-                              fill='lightgray', outline='black')
-                draw.text((card_width-250, 300), "PHOTO", 
-                         fill='gray', font=label_font)
+            rows, elapsed = attendance_export.export_attendance(
+                self.attendance_store,
+                output_path,
+                start,
+                end,
+                unique_ids,
+                export_format=export_format,
+                progress=lambda done: status.text(f"Exported {done} rows...")
+            )
+            rate = rows / elapsed if elapsed else 0.0
+            status.text(f"Exported {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+            with open(output_path, 'rb') as f:
+                st.download_button(
+                    label=f"Download {rows} attendance records",
+                    data=f,
+                    file_name=f"attendance_{start}_{end}{extension}",
+                    mime=mime
+                )
         except Exception as e:
-            st.error(f"Error loading employee photo: {e}")
-            draw.rectangle([card_width-350, 150, card_width-50, 450], 
-                         fill='lightgray', outline='black')
-            draw.text((card_width-250, 300), "PHOTO", 
-                     fill='gray', font=label_font)
-        
-        # Employee Details - Adjusted positioning to prevent overlap
-        details = [
-            ('Name', employee_data['Name']),
-            ('CNIC', employee_data['CNIC']),
-            ('Age', str(employee_data['Age'])),
-            ('Role', employee_data['Role']),
-            ('Unique ID', employee_data['Unique ID']),
-            ('City', employee_data['City']),
-            ('Shift', employee_data['Shift'])
-        ]
-        
-        # Modified layout to prevent overlap with QR code
-        start_y = 150
-        for i, (label, value) in enumerate(details):
-            # Make sure text doesn't overlap with QR code
-            draw.text((50, start_y + i*60), f"{label}:", 
-                     fill=primary_color, font=label_font)
-            draw.text((200, start_y + i*60), str(value), 
-                     fill='black', font=data_font)
-        
-        # QR Code Generation - Center at bottom
-        qr_img = self.generate_qr_code(employee_data)
-        qr_img = qr_img.resize((200, 200))
-        qr_x = (card_width - 200) // 2  # Center horizontally
-        card.paste(qr_img, (qr_x, card_height-250))
-        
-        # Footer
-        draw.line([(0, card_height-50), (card_width, card_height-50)], 
-                 fill=primary_color, width=5)
-        
-        return card
+            st.error(f"Error exporting attendance: {e}")
+        finally:
+            if os.path.exists(output_path):
+                os.remove(output_path)
 
-    def crop_to_aspect(self, image, target_width, target_height):
-        """Crop image to specified aspect ratio and resize"""
-        img_ratio = image.width / image.height
-        target_ratio = target_width / target_height
-        
-        if img_ratio > target_ratio:
-            new_height = image.height
-            new_width = int(new_height * target_ratio)
-            left = (image.width - new_width) // 2
-            top = 0
-        else:
-            new_width = image.width
-            new_height = int(new_width / target_ratio)
-            left = 0
-            top = (image.height - new_height) // 2
-        
-        cropped = image.crop((left, top, left+new_width, top+new_height))
-        return cropped.resize((target_width, target_height))
+    def filter_employees(self, employees, query):
+        """Employees whose name, Unique ID or CNIC contains the query"""
+        query = (query or '').strip()
+        if not query:
+            return employees
+        
+        mask = (
+            employees['Name'].astype(str).str.contains(query, case=False, regex=False)
+            | employees['Unique ID'].astype(str).str.contains(query, case=False, regex=False)
+            | employees['CNIC'].astype(str).str.contains(query, case=False, regex=False)
+        )
+        return employees[mask]
+
+    def live_punches(self):
+        """Punches recorded by any session, scanner or API since the tables were built"""
+        seen = st.session_state.attendance_seen_id
+        latest = self.attendance_store.latest_id()
+        if latest > seen:
+            st.info(f"{latest - seen} new punches since this page was loaded")
+            st.dataframe(self.attendance_store.punches_since(seen, limit=20))
+            if st.button("Refresh attendance"):
+                st.rerun()
 
     def record_attendance(self, unique_id, name):
-        """Record employee attendance"""
+        """Record employee attendance; returns the Punch, or None on error"""
+        results = self.record_attendance_many([(unique_id, name)])
+        return results[0] if results else None
+
+    def record_attendance_many(self, punches):
+        """Record several (unique_id, name) punches in a single write.
+
+        Repeat scans inside the debounce window are dropped by the ingestor.
+        """
         now = datetime.now()
-        attendance_record = pd.DataFrame({
-            'Unique ID': [unique_id],
-            'Name': [name],
-            'Date': [now.strftime('%Y-%m-%d')],
-            'Time': [now.strftime('%H:%M:%S')],
-            'Timestamp': [now]
-        })
-        
-        # Append to existing attendance records
-        st.session_state.attendance = pd.concat([
-            st.session_state.attendance, 
-            attendance_record
-        ], ignore_index=True)
-        
-        # Save data after recording attendance
-        self.save_data()
+        try:
+            with profiling.span('attendance.record'):
+                results = self.attendance_ingestor.submit_many(
+                    (unique_id, name, now) for unique_id, name in punches
+                )
+                self.attendance_ingestor.flush()
+            return results
+        except Exception as e:
+            st.error(f"Error saving attendance: {e}")
+            return []
+
+    def punch_message(self, punch):
+        """User-facing result of a recorded punch"""
+        if not punch.accepted:
+            return f"Repeat scan ignored: {punch.name} was marked less than {DEBOUNCE_SECONDS} seconds ago"
+        label = "check-in" if punch.kind == CHECK_IN else "check-out"
+        return f"Attendance marked for {punch.name} ({label})"
 
     def scan_qr(self):
-        """Simulate QR code scanning"""
+        """Decode uploaded QR codes and mark attendance"""
+        import qr_decoder
+
         st.subheader("Scan QR Code")
         
-        # File uploader for QR code image
-        qr_file = st.file_uploader("Upload QR Code Image", type=['png', 'jpg', 'jpeg'])
+        # Single images, several images or a ZIP of gate-camera frames
+        qr_files = st.file_uploader(
+            "Upload QR Code Images or a ZIP of frames",
+            type=['png', 'jpg', 'jpeg', 'zip'],
+            accept_multiple_files=True
+        )
         
-        if qr_file:
-            try:
+        if qr_files:
+            if len(qr_files) == 1 and not qr_files[0].name.lower().endswith('.zip'):
                 # Display the uploaded QR code
-                qr_image = Image.open(qr_file)
-                st.image(qr_image, caption="Uploaded QR Code", width=300)
-                
-                st.info("Processing QR code...")
-                st.success("QR Code scanned successfully! Ready to mark attendance.")
-                
-                # For demonstration purposes, we'll extract the first employee ID
-                # In a real app, you would use a QR code library to decode the image
-                if not st.session_state.employees.empty:
-                    unique_id = st.session_state.employees.iloc[0]['Unique ID']
-                    st.session_state.scanned_id = unique_id
-                    st.success(f"Found Employee ID: {unique_id}")
-                    
-                    # Button to mark attendance based on scanned QR
-                    if st.button("Confirm Attendance from QR"):
-                        employee = st.session_state.employees[
-                            st.session_state.employees['Unique ID'] == unique_id
-                        ]
-                        
-                        if not employee.empty:
-                            self.record_attendance(
-                                unique_id, 
-                                employee.iloc[0]['Name']
-                            )
-                            st.success(f"Attendance marked for {employee.iloc[0]['Name']}")
+                st.image(qr_files[0], caption="Uploaded QR Code", width=300)
+            
+            try:
+                # Decode once per upload; confirming reruns the script
+                upload_key = tuple((f.name, f.size) for f in qr_files)
+                cached = st.session_state.get('qr_scan')
+                if cached and cached[0] == upload_key:
+                    results = cached[1]
+                else:
+                    items = []
+                    for qr_file in qr_files:
+                        if qr_file.name.lower().endswith('.zip'):
+                            items.extend(qr_decoder.iter_zip_images(qr_file))
                         else:
-                            st.error("No employee found with this ID")
-                
+                            items.append((qr_file.name, qr_file.getvalue()))
+                    
+                    with st.spinner(f"Decoding {len(items)} image(s)..."):
+                        # Spawn: forking the threaded server can deadlock the workers
+                        results = qr_decoder.decode_many(
+                            items, mp_context=multiprocessing.get_context('spawn')
+                        )
+                    st.session_state.qr_scan = (upload_key, results)
             except Exception as e:
                 st.error(f"Error processing QR code: {e}")
-                st.warning("Could not decode QR code. Please try again with a clearer image.")
+                return
+            
+            rows = []
+            punches = []
+            for file_name, unique_id, error in results:
+                employee = self.employees.get(unique_id) if not error else None
+                if error:
+                    status = f"Could not decode: {error}"
+                elif employee is None:
+                    status = "No employee found with this ID"
+                else:
+                    status = "OK"
+                    punches.append((unique_id, employee['Name']))
+                rows.append({'Image': file_name, 'Unique ID': unique_id, 'Status': status})
+            
+            if len(rows) == 1:
+                if punches:
+                    st.success(f"Found Employee ID: {punches[0][0]}")
+                else:
+                    st.warning(f"{rows[0]['Status']}. Please try again with a clearer image.")
+            else:
+                st.info(f"Decoded {len(punches)} of {len(rows)} images")
+                st.dataframe(pd.DataFrame(rows))
+            
+            # Button to mark attendance based on scanned QR codes
+            if punches and st.button(f"Confirm Attendance from QR ({len(punches)})"):
+                results = self.record_attendance_many(punches)
+                accepted = [punch for punch in results if punch.accepted]
+                if len(results) == 1:
+                    if accepted:
+                        st.success(self.punch_message(results[0]))
+                    else:
+                        st.warning(self.punch_message(results[0]))
+                elif results:
+                    st.success(
+                        f"Attendance marked for {len(accepted)} scans "
+                        f"({len(results) - len(accepted)} repeat scans ignored)"
+                    )
 
     def admin_panel(self):
         """Admin Panel with authentication and features"""
@@ -287,59 +488,139 @@ class EmployeeCardGenerator:
             
             with tab1:
                 st.header("Generated Employee Cards")
-                # Display all employee cards
-                if not st.session_state.employees.empty:
-                    for _, employee in st.session_state.employees.iterrows():
-                        # Get photo path from employee data
-                        photo_path = employee.get('Photo')
-                        
-                        # Safely load photo
-                        try:
-                            if isinstance(photo_path, str) and os.path.exists(photo_path):
-                                photo = photo_path
-                            else:
-                                photo = None
-                        except:
-                            photo = None
-                        
-                        # Create card with default logo if needed
-                        card = self.create_employee_card(
-                            employee.to_dict(), 
-                            "alpha_tech_logo.png" if os.path.exists("alpha_tech_logo.png") else None, 
-                            photo
+                with st.expander("Import employees from a roster"):
+                    self.import_roster()
+                # Display one page of employee cards at a time
+                if len(self.employees):
+                    employees = self.filter_employees(
+                        self.employees.to_dataframe(),
+                        st.text_input("Search by name, ID or CNIC")
+                    )
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        page_size = st.selectbox("Cards per page", [10, 25, 50])
+                    page_count = max(1, -(-len(employees) // page_size))
+                    with col2:
+                        page = st.number_input(
+                            "Page", min_value=1, max_value=page_count, value=1
                         )
-                        
-                        # Display card
-                        st.image(card, caption=f"Card for {employee['Name']}")
-                        
-                        # Download button for each card
-                        buf = io.BytesIO()
-                        card.save(buf, format="PNG")
-                        byte_im = buf.getvalue()
-                        
-                        st.download_button(
+                    
+                    start = (page - 1) * page_size
+                    visible = employees.iloc[start:start + page_size]
+                    st.caption(
+                        f"Showing {start + 1 if len(visible) else 0}-{start + len(visible)} "
+                        f"of {len(employees)} employees"
+                    )
+                    
+                    # Cached cards come back at once; the rest render in the
+                    # background and appear as they finish
+                    logo_path = "alpha_tech_logo.png" if os.path.exists("alpha_tech_logo.png") else None
+                    records = visible.to_dict('records')
+                    job_ids = self.render_queue.submit_many(
+                        (employee, logo_path, employee.get('Photo')) for employee in records
+                    )
+                    
+                    for job_id, employee in zip(job_ids, records):
+                        self.show_rendered_card(
+                            job_id,
+                            employee,
+                            caption=f"Card for {employee['Name']}",
                             label=f"Download {employee['Name']}'s Card",
-                            data=byte_im,
-                            file_name=f"{employee['Unique ID']}_{employee['Name']}_employee_card.png",
-                            mime="image/png"
+                            key=f"download_card_{employee['Unique ID']}"
+                        )
+                    
+                    # Print-ready sheets for the employees matching the search
+                    st.subheader("Print Sheets")
+                    sheet_col1, sheet_col2 = st.columns(2)
+                    with sheet_col1:
+                        paper = st.selectbox("Paper", ["a4", "letter"])
+                    with sheet_col2:
+                        sheet_format = st.selectbox("Format", ["pdf", "tiff"])
+                    if len(employees) > UI_SHEET_MAX_CARDS:
+                        st.warning(
+                            f"{len(employees):,} employees match; the app builds sheets for at most "
+                            f"{UI_SHEET_MAX_CARDS:,}. Narrow the search or run "
+                            f"`python cli.py sheets cards.{sheet_format} --paper {paper}` on the server."
                         )
+                    elif st.button(f"Build print sheets for {len(employees)} employees"):
+                        self.export_print_sheets(employees, paper, sheet_format)
                 else:
                     st.info("No employee cards generated yet.")
+                
+                with st.expander("Cache statistics"):
+                    st.write("Rendered cards", self.card_cache.stats())
+                    st.write("QR codes", card_renderer.qr_image_cache.stats())
+                    st.write("Render queue", self.render_queue.stats())
+                    if st.button("Retry failed renders"):
+                        st.write(f"Queued {self.render_queue.retry_failed()} renders again")
+                    self.rebuild_stale_cards()
+
+                with st.expander("Render profiling"):
+                    self.render_profiling(visible if len(self.employees) else None)
             
             with tab2:
                 st.header("Attendance Records")
-                if not st.session_state.attendance.empty:
-                    # Display attendance with filtering options
-                    st.dataframe(st.session_state.attendance)
-                    
-                    # Optional: Download attendance as CSV
-                    csv = st.session_state.attendance.to_csv(index=False)
-                    st.download_button(
-                        "Download Attendance CSV", 
-                        csv, 
-                        "attendance_records.csv", 
-                        "text/csv"
+                # The tables below are current as of this run; the fragment polls
+                # the shared store for punches recorded after it
+                st.session_state.attendance_seen_id = self.attendance_store.latest_id()
+                st.fragment(self.live_punches, run_every=LIVE_REFRESH_SECONDS)()
+                first_day, last_day = self.attendance_store.date_bounds()
+                if first_day is not None:
+                    # Date range filter; only the selected days are read
+                    date_range = st.date_input(
+                        "Date range",
+                        value=(max(first_day, last_day - timedelta(days=30)), last_day),
+                        min_value=first_day,
+                        max_value=last_day
                     )
+                    if len(date_range) == 2:
+                        start, end = date_range
+                    else:
+                        start = end = date_range[0]
+
+                    # Employee and shift filters
+                    employees = self.employees.to_dataframe()
+                    names = dict(zip(employees['Unique ID'], employees['Name']))
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        selected_ids = st.multiselect(
+                            "Employees",
+                            list(names),
+                            format_func=lambda uid: f"{uid} - {names[uid]}"
+                        )
+                    with col2:
+                        selected_shifts = st.multiselect("Shifts", ["Morning", "Afternoon", "Night"])
+                    unique_ids = self.attendance_filter_ids(employees, selected_ids, selected_shifts)
+
+                    daily = self.attendance_store.daily_aggregates(start, end, unique_ids)
+                    summary = attendance_analytics.daily_summary(daily, employees)
+
+                    st.subheader("Per Employee")
+                    st.dataframe(attendance_analytics.employee_summary(summary))
+
+                    st.subheader("Daily Summary")
+                    st.dataframe(summary)
+
+                    st.subheader("Punches")
+                    attendance = self.attendance_store.query(start, end, unique_ids)
+                    st.dataframe(attendance)
+
+                    # Export the filtered records
+                    import attendance_export
+                    if len(attendance) > UI_EXPORT_MAX_ROWS:
+                        st.warning(
+                            f"{len(attendance):,} punches match; the app exports at most "
+                            f"{UI_EXPORT_MAX_ROWS:,}. Narrow the filters or run "
+                            f"`python cli.py export-attendance attendance.csv.gz "
+                            f"--start {start} --end {end}` on the server."
+                        )
+                    else:
+                        export_format = st.selectbox(
+                            "Export format", list(attendance_export.EXPORT_FORMATS)
+                        )
+                        if st.button("Prepare Attendance Export"):
+                            self.export_attendance(start, end, unique_ids, export_format)
                 else:
                     st.info("No attendance records available.")
             
@@ -349,17 +630,18 @@ class EmployeeCardGenerator:
                 
                 if st.button("Mark Attendance"):
                     # Find employee by Unique ID
-                    employee = st.session_state.employees[
-                        st.session_state.employees['Unique ID'] == unique_id
-                    ]
+                    employee = self.employees.get(unique_id.strip())
                     
-                    if not employee.empty:
+                    if employee is not None:
                         # Record attendance
-                        self.record_attendance(
-                            unique_id, 
-                            employee.iloc[0]['Name']
+                        punch = self.record_attendance(
+                            employee['Unique ID'], 
+                            employee['Name']
                         )
-                        st.success(f"Attendance marked for {employee.iloc[0]['Name']}")
+                        if punch is not None and punch.accepted:
+                            st.success(self.punch_message(punch))
+                        elif punch is not None:
+                            st.warning(self.punch_message(punch))
                     else:
                         st.error("No employee found with this ID")
             
@@ -378,13 +660,10 @@ class EmployeeCardGenerator:
             st.header("Employee Details")
             name = st.text_input("Employee Name")
             cnic = st.text_input("CNIC Number")
-            age = st.number_input("Age", min_value=18, max_value=65)
-            role = st.selectbox("Role", [
-                "Software Engineer", "Data Analyst", "Project Manager", 
-                "HR Specialist", "Sales Executive", "Marketing Coordinator"
-            ])
+            age = st.number_input("Age", min_value=MIN_AGE, max_value=MAX_AGE)
+            role = st.selectbox("Role", ROLES)
             city = st.text_input("City")
-            shift = st.selectbox("Shift", ["Morning", "Afternoon", "Night"])
+            shift = st.selectbox("Shift", SHIFTS)
             
             # Logo Upload
             st.subheader("Company Logo")
@@ -396,10 +675,13 @@ class EmployeeCardGenerator:
             
             # Generate Card Button
             if st.button("Generate Employee Card"):
-                if name and cnic:
-                    # Generate Unique ID
-                    unique_id = self.generate_unique_id()
-                    
+                if name and cnic and self.employees.get_by_cnic(cnic) is not None:
+                    existing = self.employees.get_by_cnic(cnic)
+                    st.error(
+                        f"CNIC {cnic} is already registered to "
+                        f"{existing['Name']} ({existing['Unique ID']})"
+                    )
+                elif name and cnic:
                     # Use company logo
                     logo_path = "alpha_tech_logo.png"
                     if logo:
@@ -410,62 +692,56 @@ class EmployeeCardGenerator:
                         except Exception as e:
                             st.error(f"Error saving logo: {e}")
                     
-                    # Save employee photo if uploaded
-                    photo_path = None
-                    if employee_photo:
-                        try:
-                            photo_path = f"employee_photo_{unique_id}.png"
-                            with open(photo_path, "wb") as f:
-                                f.write(employee_photo.getbuffer())
-                        except Exception as e:
-                            st.error(f"Error saving employee photo: {e}")
-                            photo_path = None
-                    
                     # Prepare employee data
                     employee_data = {
-                        'Unique ID': unique_id,
                         'Name': name,
                         'CNIC': cnic,
                         'Age': age,
                         'Role': role,
                         'City': city,
                         'Shift': shift,
-                        'Photo': photo_path  # Store the path to the photo
+                        'Photo': None
                     }
                     
-                    # Add to employees DataFrame
-                    new_employee = pd.DataFrame([employee_data])
-                    st.session_state.employees = pd.concat([
-                        st.session_state.employees, 
-                        new_employee
-                    ], ignore_index=True)
-                    
-                    # Save data
-                    self.save_data()
-                    
-                    # Create card
-                    card = self.create_employee_card(
-                        employee_data, 
-                        logo_path, 
-                        photo_path
-                    )
-                    
-                    # Display and Download Card
-                    buf = io.BytesIO()
-                    card.save(buf, format="PNG")
-                    byte_im = buf.getvalue()
+                    # Add to the shared store, which assigns the Unique ID and saves it to disk
+                    try:
+                        employee_data = self.employees.add(employee_data)
+                    except DuplicateEmployee as e:
+                        st.error(str(e))
+                        return
                     
-                    st.image(card, caption="Generated Employee Card")
+                    # Save employee photo if uploaded, now that its ID is taken
+                    photo_path = None
+                    if employee_photo:
+                        try:
+                            # Store an oriented, card-sized copy under data/photos
+                            photo_path = photo_pipeline.ingest_photo(
+                                employee_photo, employee_data['Unique ID']
+                            )
+                            employee_data = self.employees.update(
+                                employee_data['Unique ID'], {'Photo': photo_path}
+                            )
+                        except Exception as e:
+                            st.error(f"Error saving employee photo: {e}")
+                            photo_path = None
                     
-                    # Download Button
-                    st.download_button(
-                        label="Download Employee Card",
-                        data=byte_im,
-                        file_name=f"{unique_id}_{name}_employee_card.png",
-                        mime="image/png"
+                    # Render in the background (also warms the admin gallery's cache)
+                    st.session_state.card_job = (
+                        self.render_queue.submit(employee_data, logo_path, photo_path),
+                        employee_data
                     )
                 else:
                     st.warning("Please fill all required details")
+            
+            # Display and download the last generated card once it is ready
+            if 'card_job' in st.session_state:
+                job_id, employee_data = st.session_state.card_job
+                self.show_rendered_card(
+                    job_id,
+                    employee_data,
+                    caption="Generated Employee Card",
+                    label="Download Employee Card"
+                )
 
     def main_app(self):
         """Main Streamlit Application"""
@@ -475,16 +751,11 @@ class EmployeeCardGenerator:
             layout="wide"
         )
         
-        # Save default logo if not exists
-        if not os.path.exists("alpha_tech_logo.png"):
-            try:
-                # Create a simple logo if one doesn't exist
-                logo = Image.new('RGBA', (200, 100), (0, 0, 0, 0))
-                draw = ImageDraw.Draw(logo)
-                draw.text((10, 40), "ALPHA TECH", fill=(255, 215, 0))
-                logo.save("alpha_tech_logo.png")
-            except Exception as e:
-                st.error(f"Error creating default logo: {e}")
+        # Default logo, fonts and card template are prepared once per process
+        try:
+            load_assets()
+        except Exception as e:
+            st.error(f"Error loading card assets: {e}")
         
         # Main title
         st.title("🏢 Alpha Tech Employee Management System")
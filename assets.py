@@ -0,0 +1,106 @@
+"""Fonts and logos used to draw cards, resolved once per process.
+
+The card font is looked up once (``EMPLOYEE_CARD_FONT``, then the DejaVu
+Sans bundled under ``assets/fonts``, then Arial) and each size is loaded
+once. Logos are decoded, converted to RGBA and scaled to the header size
+once per file version.
+"""
+import os
+import threading
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+FONT_ENV_VAR = 'EMPLOYEE_CARD_FONT'
+FONT_CANDIDATES = (
+    os.path.join(ASSET_DIR, 'fonts', 'DejaVuSans.ttf'),
+    'arial.ttf',
+    'DejaVuSans.ttf',
+)
+
+DEFAULT_LOGO_PATH = "alpha_tech_logo.png"
+LOGO_SIZE = (80, 80)
+
+_lock = threading.Lock()
+_font_path = None
+_fonts = {}
+_logos = {}
+
+
+def font_path():
+    """Path of the first usable TrueType font, or '' if there is none"""
+    global _font_path
+    if _font_path is None:
+        candidates = [os.environ.get(FONT_ENV_VAR)] + list(FONT_CANDIDATES)
+        resolved = ''
+        for candidate in candidates:
+            if not candidate:
+                continue
+            try:
+                ImageFont.truetype(candidate, 10)
+            except OSError:
+                continue
+            resolved = candidate
+            break
+        _font_path = resolved
+    return _font_path
+
+
+def font(size):
+    """The card font at ``size`` pixels, loaded once per size"""
+    with _lock:
+        loaded = _fonts.get(size)
+    if loaded is None:
+        path = font_path()
+        if path:
+            loaded = ImageFont.truetype(path, size)
+        else:
+            # Pillow's built-in font is scalable when FreeType is available
+            try:
+                loaded = ImageFont.load_default(size)
+            except (TypeError, ImportError):
+                loaded = ImageFont.load_default()
+        with _lock:
+            _fonts[size] = loaded
+    return loaded
+
+
+def prepare_logo(source):
+    """Decode a logo into the RGBA header-sized image pasted on cards"""
+    with Image.open(source) as image:
+        return image.convert('RGBA').resize(LOGO_SIZE, Image.LANCZOS)
+
+
+def logo(path):
+    """Prepared logo for a file, reloaded only when the file changes"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        image = _logos.get(key)
+    if image is None:
+        image = prepare_logo(path)
+        with _lock:
+            # Only the current version of each file is worth keeping
+            for old_key in [k for k in _logos if k[0] == key[0]]:
+                del _logos[old_key]
+            _logos[key] = image
+    return image
+
+
+def ensure_default_logo(path=DEFAULT_LOGO_PATH):
+    """Create a simple placeholder logo if none exists"""
+    if os.path.exists(path):
+        return
+    placeholder = Image.new('RGBA', (200, 100), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(placeholder)
+    draw.text((10, 40), "ALPHA TECH", fill=(255, 215, 0))
+    placeholder.save(path)
+
+
+def preload(font_sizes=(), logo_path=DEFAULT_LOGO_PATH):
+    """Resolve fonts and decode the logo ahead of the first card"""
+    for size in font_sizes:
+        font(size)
+    if logo_path and os.path.exists(logo_path):
+        logo(logo_path)
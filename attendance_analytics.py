@@ -0,0 +1,42 @@
+import pandas as pd
+
+from attendance_ingest import SHIFT_STARTS
+
+
+# How late a first punch may be before it counts as a late arrival
+LATE_GRACE = pd.Timedelta(minutes=15)
+
+
+def daily_summary(daily, employees):
+    """Add hours worked and late arrivals to the store's daily aggregates.
+
+    ``daily`` comes from ``AttendanceStore.daily_aggregates`` and
+    ``employees`` is the employee DataFrame (for each person's Shift).
+    Rows are per shift day, so a Night shift that runs past midnight is
+    one row dated the day it starts. The first punch of a shift is its
+    check-in and the last its final check-out, so hours worked is the
+    time between them and Late compares the check-in with the shift start.
+    """
+    summary = daily.copy()
+    summary['Hours Worked'] = (
+        (summary['Last Out'] - summary['First In']).dt.total_seconds() / 3600
+    ).round(2)
+
+    shifts = employees.drop_duplicates('Unique ID').set_index('Unique ID')['Shift']
+    summary['Shift'] = summary['Unique ID'].astype(str).map(shifts).astype('category')
+    shift_start = summary['Date'] + pd.to_timedelta(summary['Shift'].astype(object).map(SHIFT_STARTS))
+    summary['Late'] = (summary['First In'] > shift_start + LATE_GRACE).fillna(False).astype(bool)
+    return summary
+
+
+def employee_summary(summary):
+    """Roll daily rows up to one row per employee"""
+    grouped = summary.groupby('Unique ID', observed=True)
+    result = pd.DataFrame({
+        'Name': grouped['Name'].last(),
+        'Days Present': grouped['Date'].nunique(),
+        'Hours Worked': grouped['Hours Worked'].sum().round(2),
+        'Late Arrivals': grouped['Late'].sum().astype(int),
+        'Punches': grouped['Punches'].sum(),
+    })
+    return result.reset_index()
@@ -0,0 +1,100 @@
+"""Streaming attendance exports.
+
+Rows are read from the attendance store in fixed-size chunks and written
+straight to the output file, so memory use depends on ``chunk_size`` rather
+than on how much history is exported.
+"""
+import bz2
+import gzip
+import time
+
+
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'csv.bz2': ('.csv.bz2', 'application/x-bzip2'),
+    'xlsx': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+# Excel's row limit, less the header row
+XLSX_MAX_ROWS = 1048575
+
+
+def format_for_path(path):
+    """Export format implied by a file name"""
+    lower = path.lower()
+    for name, (extension, _) in sorted(EXPORT_FORMATS.items(), key=lambda item: -len(item[1][0])):
+        if lower.endswith(extension):
+            return name
+    raise ValueError(f"Unsupported export file {path!r}; use one of "
+                     f"{', '.join(ext for ext, _ in EXPORT_FORMATS.values())}")
+
+
+def _open_text(path, export_format):
+    if export_format == 'csv.gz':
+        return gzip.open(path, 'wt', compresslevel=6, newline='', encoding='utf-8')
+    if export_format == 'csv.bz2':
+        return bz2.open(path, 'wt', newline='', encoding='utf-8')
+    return open(path, 'w', newline='', encoding='utf-8')
+
+
+def _write_csv(chunks, path, export_format, progress):
+    rows = 0
+    with _open_text(path, export_format) as f:
+        for chunk in chunks:
+            chunk.to_csv(f, header=rows == 0, index=False)
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+    return rows
+
+
+def _write_xlsx(chunks, path, progress):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("Excel export requires openpyxl (pip install openpyxl)")
+
+    # Write-only workbooks stream rows to disk instead of keeping cells in memory
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = rows = 0
+    for chunk in chunks:
+        for record in chunk.itertuples(index=False):
+            if sheet is None or sheet_rows == XLSX_MAX_ROWS:
+                sheet = workbook.create_sheet(f"Attendance {len(workbook.worksheets) + 1}")
+                sheet.append(list(chunk.columns))
+                sheet_rows = 0
+            sheet.append([value.to_pydatetime() if hasattr(value, 'to_pydatetime') else value
+                          for value in record])
+            sheet_rows += 1
+        rows += len(chunk)
+        if progress:
+            progress(rows)
+
+    if sheet is None:
+        workbook.create_sheet("Attendance 1")
+    workbook.save(path)
+    return rows
+
+
+def export_attendance(store, output_path, start=None, end=None, unique_ids=None,
+                      export_format=None, chunk_size=50000, progress=None):
+    """Write filtered attendance to ``output_path`` one chunk at a time.
+
+    ``start``/``end`` are inclusive dates and ``unique_ids`` restricts the
+    export to those employees. The format follows the file extension unless
+    ``export_format`` is given. ``progress`` is called with the running row
+    count after each chunk. Returns ``(rows, seconds)``.
+    """
+    export_format = export_format or format_for_path(output_path)
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {export_format!r}")
+
+    started = time.perf_counter()
+    chunks = store.iter_chunks(start, end, unique_ids, chunk_size=chunk_size)
+    if export_format == 'xlsx':
+        rows = _write_xlsx(chunks, output_path, progress)
+    else:
+        rows = _write_csv(chunks, output_path, export_format, progress)
+    return rows, time.perf_counter() - started
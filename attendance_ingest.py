@@ -0,0 +1,181 @@
+"""Debounced, shift-aware ingestion of attendance punches.
+
+Scanners re-read a card many times a second while it is held in front of
+them. The ingestor keeps an in-memory table of each employee's last
+accepted punch and drops repeats inside a debounce window, labels the
+punches it keeps as check-in or check-out for the employee's shift, and
+writes them to the attendance store in batches.
+"""
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+
+
+# Scheduled start of each shift
+SHIFT_STARTS = {
+    'Morning': timedelta(hours=9),
+    'Afternoon': timedelta(hours=14),
+    'Night': timedelta(hours=22),
+}
+
+DEBOUNCE_SECONDS = 60
+
+# Punches up to this long before a shift starts already count towards it
+EARLY_ARRIVAL = timedelta(hours=4)
+
+CHECK_IN = 'in'
+CHECK_OUT = 'out'
+
+Punch = namedtuple('Punch', 'unique_id name timestamp kind accepted')
+
+_SHIFT_OFFSETS = {
+    shift: start - EARLY_ARRIVAL for shift, start in SHIFT_STARTS.items()
+}
+
+
+def shift_day(timestamp, shift):
+    """Date of the shift a punch belongs to.
+
+    Night punches after midnight count for the day before; punches of
+    employees without a known shift count for their calendar day.
+    """
+    return (timestamp - _SHIFT_OFFSETS.get(shift, timedelta(0))).date()
+
+
+class AttendanceIngestor:
+    """Debounce, classify and batch punches in front of an AttendanceStore.
+
+    ``shift_of`` maps a Unique ID to the employee's Shift (or None). A punch
+    within ``window`` seconds of the employee's last accepted punch is
+    dropped. The first punch of a shift is a check-in and later ones are
+    check-outs, so the last one of the shift marks when the employee left.
+    Accepted punches are written once ``batch_size`` are buffered or when
+    ``flush`` is called.
+    """
+
+    def __init__(self, store, shift_of=None, window=DEBOUNCE_SECONDS, batch_size=500):
+        self.store = store
+        self.shift_of = shift_of or (lambda unique_id: None)
+        self.window = timedelta(seconds=window)
+        self.batch_size = batch_size
+        self.accepted = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = []
+        # (unique_id, timestamp) -> previous last-seen time, for punches
+        # classified by classify_many and not yet confirmed or released
+        self._unconfirmed = {}
+
+        # Seed from recent history so a restart doesn't reopen every shift
+        since = (datetime.now() - timedelta(days=2)).date()
+        self._last_seen = dict(store.last_punches(since))
+
+    def submit(self, unique_id, name, timestamp=None):
+        """Debounce and classify one punch; returns a Punch"""
+        return self.submit_many([(unique_id, name, timestamp)])[0]
+
+    def submit_many(self, events):
+        """Debounce and classify (unique_id, name, timestamp) events in order"""
+        with self._lock:
+            results = self._classify(events)
+            self._pending.extend(
+                (punch.unique_id, punch.name, punch.timestamp, punch.kind)
+                for punch in results if punch.accepted
+            )
+            full = len(self._pending) >= self.batch_size
+
+        if full:
+            self.flush()
+        return results
+
+    def classify_many(self, events):
+        """Debounce and classify events without buffering them.
+
+        For callers that write accepted punches themselves, such as the
+        HTTP API's request batcher. Accepted punches must be passed to
+        ``confirm`` once written or to ``release`` if the write failed, so
+        a retry of a lost punch isn't dropped as a repeat scan.
+        """
+        events = list(events)
+        with self._lock:
+            previous = {str(unique_id): self._last_seen.get(str(unique_id))
+                        for unique_id, _, _ in events}
+            results = self._classify(events)
+            for punch in results:
+                if punch.accepted:
+                    self._unconfirmed[(punch.unique_id, punch.timestamp)] = previous[punch.unique_id]
+                    previous[punch.unique_id] = punch.timestamp
+            return results
+
+    def confirm(self, punches):
+        """Mark punches from classify_many as written"""
+        with self._lock:
+            for punch in punches:
+                self._unconfirmed.pop((punch.unique_id, punch.timestamp), None)
+
+    def release(self, punches):
+        """Forget punches from classify_many that could not be written"""
+        with self._lock:
+            for punch in punches:
+                key = (punch.unique_id, punch.timestamp)
+                if key not in self._unconfirmed:
+                    continue
+                previous = self._unconfirmed.pop(key)
+                self.accepted -= 1
+                # Only roll back if no later punch has been accepted since
+                if self._last_seen.get(punch.unique_id) == punch.timestamp:
+                    if previous is None:
+                        del self._last_seen[punch.unique_id]
+                    else:
+                        self._last_seen[punch.unique_id] = previous
+
+    def _classify(self, events):
+        """Update the last-seen table; callers hold the lock"""
+        now = datetime.now()
+        results = []
+        for unique_id, name, timestamp in events:
+            unique_id = str(unique_id)
+            timestamp = timestamp or now
+            last = self._last_seen.get(unique_id)
+            if last is not None and abs(timestamp - last) < self.window:
+                self.duplicates += 1
+                results.append(Punch(unique_id, name, timestamp, None, False))
+                continue
+
+            shift = self.shift_of(unique_id)
+            if last is not None and shift_day(last, shift) == shift_day(timestamp, shift):
+                kind = CHECK_OUT
+            else:
+                kind = CHECK_IN
+            if last is None or timestamp > last:
+                self._last_seen[unique_id] = timestamp
+            self.accepted += 1
+            results.append(Punch(unique_id, name, timestamp, kind, True))
+        return results
+
+    def flush(self):
+        """Write buffered punches in one transaction; returns how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                self.store.append_many(batch)
+            except Exception:
+                # Keep the punches for the next flush rather than losing them
+                with self._lock:
+                    self._pending[:0] = batch
+                raise
+            return len(batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'accepted': self.accepted,
+                'duplicates': self.duplicates,
+                'pending': len(self._pending),
+                'tracked_employees': len(self._last_seen),
+            }
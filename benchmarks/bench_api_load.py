@@ -0,0 +1,155 @@
+"""Load test for the local HTTP API.
+
+Starts the API on a temporary copy of synthetic data (or targets a running
+server with --url) and fires concurrent requests from keep-alive
+connections, reporting throughput and p50/p99 latency per endpoint.
+
+Run from the repository root:
+
+    python benchmarks/bench_api_load.py --requests 5000 --concurrency 32
+    python benchmarks/bench_api_load.py --url http://127.0.0.1:8000 --employees 40
+"""
+import argparse
+import http.client
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api  # noqa: E402
+from storage import EMPLOYEE_COLUMNS  # noqa: E402
+
+
+def write_employees(path, count):
+    employees = pd.DataFrame([{
+        'Unique ID': f"AT-{i:03d}",
+        'Name': f"Employee {i}",
+        'CNIC': f"35202-{i:07d}-1",
+        'Age': 30,
+        'Role': 'Developer',
+        'City': 'Lahore',
+        'Shift': 'Morning',
+        'Photo': None,
+    } for i in range(1, count + 1)], columns=EMPLOYEE_COLUMNS)
+    with open(path, 'wb') as f:
+        pickle.dump(employees, f)
+
+
+def start_server(tmp, employees, port):
+    import uvicorn
+
+    employees_path = os.path.join(tmp, 'employees.pkl')
+    write_employees(employees_path, employees)
+    app = api.create_app(
+        employees_path,
+        os.path.join(tmp, 'attendance.db'),
+        card_cache_dir=os.path.join(tmp, 'card_cache'),
+        token='',
+        # Every POST is a distinct punch here, so measure the write path
+        debounce=0,
+    )
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def run_load(host, port, requests, concurrency, make_request):
+    """Send ``requests`` requests over ``concurrency`` connections; return latencies"""
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker(_):
+        conn = http.client.HTTPConnection(host, port)
+        local = []
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            method, path, body = make_request(i)
+            headers = {'Content-Type': 'application/json'} if body else {}
+            started = time.perf_counter()
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - started)
+            if response.status >= 400:
+                raise RuntimeError(f"{method} {path}: HTTP {response.status}")
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return np.array(latencies), time.perf_counter() - started
+
+
+def report(label, latencies, elapsed):
+    p50, p99 = np.percentile(latencies * 1000, [50, 99])
+    print(f"{label:<20} {len(latencies):6d} req {len(latencies) / elapsed:9.1f} req/s "
+          f"p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="target a running server instead of starting one")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+
+    ids = [f"AT-{i:03d}" for i in range(1, args.employees + 1)]
+    scenarios = [
+        ("POST /attendance", lambda i: (
+            'POST', '/attendance', json.dumps({'unique_id': ids[i % len(ids)]}))),
+        ("GET /employees", lambda i: ('GET', f"/employees/{ids[i % len(ids)]}", None)),
+        ("GET /cards (cold)", lambda i: ('GET', f"/cards/{ids[i % len(ids)]}.png", None)),
+        ("GET /cards (warm)", lambda i: ('GET', f"/cards/{ids[i % len(ids)]}.png", None)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.url:
+            parsed = urlparse(args.url)
+            host, port = parsed.hostname, parsed.port or 80
+        else:
+            host, port = '127.0.0.1', args.port
+            server, thread = start_server(tmp, args.employees, port)
+
+        try:
+            for label, make_request in scenarios:
+                # Card renders are slow; the cold pass renders each card once
+                count = len(ids) if 'cold' in label else args.requests
+                latencies, elapsed = run_load(host, port, count, args.concurrency, make_request)
+                report(label, latencies, elapsed)
+
+            if server is not None:
+                conn = http.client.HTTPConnection(host, port)
+                conn.request('GET', '/stats')
+                stats = json.loads(conn.getresponse().read())
+                batches = stats['attendance_batches']
+                print(f"{batches['punches']} punches written in {batches['batches']} transactions")
+        finally:
+            if server is not None:
+                server.should_exit = True
+                thread.join()
+
+
+if __name__ == "__main__":
+    main()
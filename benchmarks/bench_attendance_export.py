@@ -0,0 +1,74 @@
+"""Compare the in-memory CSV export with the streaming chunked export.
+
+Fills a temporary attendance store with synthetic punches, then measures
+rows/s and peak Python memory (tracemalloc) for ``to_dataframe().to_csv()``
+and for ``attendance_export.export_attendance`` in each format.
+
+Run from the repository root:
+
+    python benchmarks/bench_attendance_export.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import attendance_export  # noqa: E402
+from storage import AttendanceStore  # noqa: E402
+
+
+def fill_store(store, rows, employees=500, batch=50000):
+    start = datetime(2024, 1, 1, 8, 0)
+    for offset in range(0, rows, batch):
+        store.append_many(
+            (f"AT-{i % employees + 1:03d}", f"Employee {i % employees + 1}",
+             start + timedelta(seconds=37 * i))
+            for i in range(offset, min(offset + batch, rows))
+        )
+
+
+def measure(label, rows, func):
+    # Time and trace separately; tracemalloc slows allocation-heavy code
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} {elapsed:7.2f}s {rows / elapsed:12,.0f} rows/s "
+          f"peak {peak / 1e6:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--formats', nargs='+', default=['csv', 'csv.gz'],
+                        choices=sorted(attendance_export.EXPORT_FORMATS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AttendanceStore(os.path.join(tmp, 'attendance.db'))
+        fill_store(store, args.rows)
+        print(f"{store.count()} punches, chunk size {args.chunk_size}")
+
+        measure("in-memory to_csv", args.rows, lambda: store.to_dataframe().to_csv(index=False))
+
+        for export_format in args.formats:
+            extension, _ = attendance_export.EXPORT_FORMATS[export_format]
+            path = os.path.join(tmp, f"export{extension}")
+            measure(f"streaming {export_format}", args.rows, lambda: attendance_export.export_attendance(
+                store, path, chunk_size=args.chunk_size
+            ))
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
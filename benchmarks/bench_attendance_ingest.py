@@ -0,0 +1,100 @@
+"""Replay a synthetic day of gate scans through the attendance ingestor.
+
+Each employee arrives around their shift start and leaves about eight hours
+later. Every pass through the gate is a burst of repeated reads of the same
+card, the way a scanner re-reads a card held in front of it. The same
+events are then written the old way, one row per scan, for comparison.
+
+Run from the repository root:
+
+    python benchmarks/bench_attendance_ingest.py --events 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance_ingest import CHECK_IN, SHIFT_STARTS, AttendanceIngestor  # noqa: E402
+from storage import AttendanceStore  # noqa: E402
+
+
+def synthetic_day(events, employees, seed=0):
+    """Time-ordered (unique_id, name, timestamp) scans and each employee's shift"""
+    rng = np.random.default_rng(seed)
+    day = datetime(2025, 3, 3)
+    shifts = list(SHIFT_STARTS)
+    shift_of = {f"AT-{i:05d}": shifts[i % len(shifts)] for i in range(1, employees + 1)}
+
+    # Two gate passes per employee; split the event budget into read bursts
+    passes = []
+    for unique_id, shift in shift_of.items():
+        start = day + SHIFT_STARTS[shift]
+        arrive = start + timedelta(minutes=float(rng.normal(-5, 10)))
+        leave = arrive + timedelta(hours=8, minutes=float(rng.normal(0, 20)))
+        passes.extend([(unique_id, arrive), (unique_id, leave)])
+    bursts = rng.multinomial(events - len(passes), np.ones(len(passes)) / len(passes)) + 1
+
+    scans = []
+    for (unique_id, moment), reads in zip(passes, bursts):
+        # Repeat reads 50-300 ms apart while the card is held up
+        offsets = np.cumsum(rng.uniform(0.05, 0.3, reads))
+        name = f"Employee {unique_id[3:]}"
+        scans.extend((unique_id, name, moment + timedelta(seconds=float(o))) for o in offsets)
+    scans.sort(key=lambda scan: scan[2])
+    return scans, shift_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--employees', type=int, default=2000)
+    parser.add_argument('--window', type=float, default=60)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--naive-events', type=int, default=5000,
+                        help="scans to write one row at a time for the baseline")
+    args = parser.parse_args()
+
+    scans, shift_of = synthetic_day(args.events, args.employees)
+    print(f"{len(scans)} scans from {args.employees} employees")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AttendanceStore(os.path.join(tmp, 'ingest.db'))
+        ingestor = AttendanceIngestor(
+            store, shift_of=shift_of.get, window=args.window, batch_size=args.batch_size
+        )
+        started = time.perf_counter()
+        # Feed the scanner stream in small groups, as a gate controller would
+        check_ins = 0
+        for i in range(0, len(scans), 50):
+            for punch in ingestor.submit_many(scans[i:i + 50]):
+                check_ins += punch.accepted and punch.kind == CHECK_IN
+        ingestor.flush()
+        elapsed = time.perf_counter() - started
+        stats = ingestor.stats()
+        print(f"ingestor   {elapsed:7.2f}s {len(scans) / elapsed:10,.0f} scans/s  "
+              f"stored {store.count()} rows ({check_ins} check-ins, "
+              f"{stats['accepted'] - check_ins} check-outs), "
+              f"{stats['duplicates']} repeats dropped")
+        store.close()
+
+        naive = scans[:args.naive_events]
+        store = AttendanceStore(os.path.join(tmp, 'naive.db'))
+        started = time.perf_counter()
+        for unique_id, name, timestamp in naive:
+            store.append(unique_id, name, timestamp)
+        elapsed = time.perf_counter() - started
+        rate = len(naive) / elapsed
+        print(f"per-scan   {elapsed:7.2f}s {rate:10,.0f} scans/s  "
+              f"({len(naive)} scans; a full day would store {len(scans)} rows "
+              f"in ~{len(scans) / rate:.0f}s)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Per-card render time with and without the cached card template.
+
+Run from the repository root:
+
+    python benchmarks/bench_card_template.py --cards 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import card_renderer  # noqa: E402
+
+
+def sample_employee(i):
+    return {
+        'Unique ID': f'AT-{i:05d}',
+        'Name': f'Employee {i}',
+        'CNIC': f'35202-{i:07d}-1',
+        'Age': 20 + i % 40,
+        'Role': 'Software Engineer',
+        'City': 'Lahore',
+        'Shift': 'Morning',
+        'Photo': None,
+    }
+
+
+def time_cards(cards, logo_path, cold, warm_qr=False):
+    """Mean milliseconds per card; ``cold`` rebuilds the static layer every card.
+
+    Unless ``warm_qr`` is set the QR cache starts empty, so every card
+    renders its QR code.
+    """
+    card_renderer.clear_template_cache()
+    if not warm_qr:
+        card_renderer.qr_image_cache.clear()
+    started = time.perf_counter()
+    for i in range(cards):
+        if cold:
+            card_renderer.clear_template_cache()
+        card_renderer.create_employee_card(sample_employee(i), logo_path)
+    return (time.perf_counter() - started) * 1000 / cards
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=int, default=200)
+    parser.add_argument('--logo', default=card_renderer.DEFAULT_LOGO_PATH)
+    args = parser.parse_args()
+
+    # Warm up imports and the font lookup
+    card_renderer.create_employee_card(sample_employee(0), args.logo)
+
+    before = time_cards(args.cards, args.logo, cold=True)
+    after = time_cards(args.cards, args.logo, cold=False)
+    # Same employees again, so every QR bitmap comes from the cache
+    warm = time_cards(args.cards, args.logo, cold=False, warm_qr=True)
+    print(f"cards: {args.cards}")
+    print(f"without template cache: {before:.2f} ms/card")
+    print(f"with template cache:    {after:.2f} ms/card")
+    print(f"speedup:                {before / after:.2f}x")
+    print(f"with warm QR cache:     {warm:.2f} ms/card")
+    print(f"QR cache: {card_renderer.qr_image_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
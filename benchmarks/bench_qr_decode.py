@@ -0,0 +1,53 @@
+"""Throughput of decoding a folder of card QR images.
+
+Run from the repository root:
+
+    python benchmarks/bench_qr_decode.py --images 1000 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import card_renderer  # noqa: E402
+import qr_decoder  # noqa: E402
+from bench_card_template import sample_employee  # noqa: E402
+
+
+def write_images(folder, count, cards):
+    """Write ``count`` QR images (or whole cards) to ``folder``"""
+    for i in range(count):
+        employee = sample_employee(i)
+        if cards:
+            image = card_renderer.create_employee_card(employee, card_renderer.DEFAULT_LOGO_PATH)
+        else:
+            image = card_renderer.generate_qr_code(employee).get_image()
+        image.save(os.path.join(folder, f"{employee['Unique ID']}.png"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cards', action='store_true',
+                        help="decode full card renders instead of bare QR images")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        started = time.perf_counter()
+        write_images(folder, args.images, args.cards)
+        print(f"generated {args.images} images in {time.perf_counter() - started:.1f}s")
+
+        for workers in (1, args.workers):
+            results, elapsed = qr_decoder.decode_folder(folder, workers=workers)
+            ok = sum(1 for _, unique_id, error in results if not error)
+            label = workers or os.cpu_count()
+            print(f"workers={label}: decoded {ok}/{len(results)} in {elapsed:.2f}s "
+                  f"({len(results) / elapsed:.1f} images/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compare the verbose legacy QR payload with the compact signed payload.
+
+Measures QR version, encode time (make + image + resize to the card's
+200x200) and decode success rate on full rendered cards.
+
+Run from the repository root:
+
+    python benchmarks/bench_qr_payload.py --cards 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import qrcode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import card_renderer  # noqa: E402
+import qr_decoder  # noqa: E402
+from bench_card_template import sample_employee  # noqa: E402
+
+
+def legacy_qr(employee_data):
+    """QR code as generated before compact payloads"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data("\n".join([f"{key}: {value}" for key, value in employee_data.items()]))
+    qr.make(fit=True)
+    return qr
+
+
+def compact_qr(employee_data):
+    return card_renderer.generate_qr_code(employee_data)
+
+
+def measure(name, build, employees, scale):
+    versions = []
+    started = time.perf_counter()
+    images = []
+    for employee in employees:
+        qr = build(employee)
+        if isinstance(qr, qrcode.QRCode):
+            versions.append(qr.version)
+            qr = qr.make_image(fill_color="black", back_color="white")
+        else:
+            versions.append(card_renderer.QR_VERSION)
+        images.append(qr.resize((200, 200)))
+    encode_ms = (time.perf_counter() - started) * 1000 / len(employees)
+
+    # Paste onto a blank card the way create_employee_card does
+    template = card_renderer.get_card_template(card_renderer.DEFAULT_LOGO_PATH)
+    decoded = 0
+    started = time.perf_counter()
+    for employee, image in zip(employees, images):
+        card = template.copy()
+        card.paste(image, card_renderer.QR_POSITION)
+        if scale != 1.0:
+            # Simulate a low-resolution scan of the printed card
+            card = card.resize((int(card.width * scale), int(card.height * scale)))
+        try:
+            if qr_decoder.extract_unique_id(qr_decoder.decode_image(card)) == employee['Unique ID']:
+                decoded += 1
+        except qr_decoder.QRDecodeError:
+            pass
+    decode_ms = (time.perf_counter() - started) * 1000 / len(employees)
+
+    print(f"{name:8s} version {min(versions)}-{max(versions)}  "
+          f"encode {encode_ms:6.2f} ms  decode {decode_ms:6.2f} ms  "
+          f"success {decoded}/{len(employees)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=int, default=200)
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="downscale cards before decoding")
+    args = parser.parse_args()
+
+    employees = []
+    for i in range(args.cards):
+        employee = sample_employee(i)
+        employee['Photo'] = f"data/photos/{employee['Unique ID']}.jpg"
+        employees.append(employee)
+
+    measure('verbose', legacy_qr, employees, args.scale)
+    measure('compact', compact_qr, employees, args.scale)
+
+
+if __name__ == "__main__":
+    main()
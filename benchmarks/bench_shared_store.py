@@ -0,0 +1,105 @@
+"""Memory and startup time of concurrent sessions: per-session pickles vs the shared store.
+
+Simulates N Streamlit sessions starting at once against a synthetic roster.
+"per-session" is the old behaviour (every session unpickles employees.pkl
+into its own repository); "shared" is one EmployeeStore that every session
+reads from, as ``get_employee_store`` provides in the app.
+
+Run from the repository root:
+
+    python benchmarks/bench_shared_store.py --sessions 20 --employees 20000
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import EMPLOYEE_COLUMNS, EmployeeRepository, EmployeeStore  # noqa: E402
+
+
+def write_roster(path, count):
+    employees = pd.DataFrame([{
+        'Unique ID': f"AT-{i:05d}",
+        'Name': f"Employee {i}",
+        'CNIC': f"35202-{i:07d}-1",
+        'Age': 20 + i % 40,
+        'Role': 'Software Engineer',
+        'City': 'Lahore',
+        'Shift': ('Morning', 'Afternoon', 'Night')[i % 3],
+        'Photo': f"data/photos/AT-{i:05d}.jpg",
+    } for i in range(1, count + 1)], columns=EMPLOYEE_COLUMNS)
+    with open(path, 'wb') as f:
+        pickle.dump(employees, f)
+
+
+def run_sessions(sessions, start_session, trace=False):
+    """Start ``sessions`` sessions concurrently; return (seconds, traced MB held)"""
+    held = [None] * sessions
+    barrier = threading.Barrier(sessions)
+
+    def session(i):
+        barrier.wait()
+        held[i] = start_session()
+
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    megabytes = None
+    if trace:
+        megabytes = tracemalloc.get_traced_memory()[0] / 1e6
+        tracemalloc.stop()
+    return elapsed, megabytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--employees', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'employees.pkl')
+        write_roster(path, args.employees)
+
+        def per_session():
+            with open(path, 'rb') as f:
+                repo = EmployeeRepository(pickle.load(f))
+            return repo, repo.to_dataframe()
+
+        shared = {}
+        shared_lock = threading.Lock()
+
+        def shared_session():
+            # Mirrors st.cache_resource: the first session builds the store
+            with shared_lock:
+                if 'store' not in shared:
+                    shared['store'] = EmployeeStore(path)
+            store = shared['store']
+            store.refresh()
+            return store, store.to_dataframe()
+
+        print(f"{args.sessions} sessions, {args.employees} employees")
+        for label, start_session in (("per-session", per_session), ("shared", shared_session)):
+            # Time untraced; tracemalloc slows allocation-heavy code
+            elapsed, _ = run_sessions(args.sessions, start_session)
+            shared.clear()
+            _, megabytes = run_sessions(args.sessions, start_session, trace=True)
+            print(f"{label:<12} startup {elapsed:6.2f}s  held {megabytes:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
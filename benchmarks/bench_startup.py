@@ -0,0 +1,83 @@
+"""Cold-start times of the CLI, the card renderer and the Streamlit app.
+
+Every measurement runs in a fresh interpreter, so nothing is shared
+between runs; the median of --runs is reported. --root points at another
+checkout to compare against an older revision.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_CARD = """
+import time
+started = time.perf_counter()
+import card_renderer
+card_renderer.create_employee_card({
+    'Unique ID': 'AT-001', 'Name': 'Jane Doe', 'CNIC': '35202-1234567-1', 'Age': 30,
+    'Role': 'Software Engineer', 'City': 'Lahore', 'Shift': 'Morning'
+}, card_renderer.DEFAULT_LOGO_PATH)
+print(time.perf_counter() - started)
+"""
+
+APP_FIRST_RUN = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+started = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+assert not at.exception, at.exception
+print(time.perf_counter() - started)
+"""
+
+WALL_CLOCK = """
+import subprocess, sys, time
+started = time.perf_counter()
+subprocess.run(sys.argv[1:], check=True, stdout=subprocess.DEVNULL)
+print(time.perf_counter() - started)
+"""
+
+
+def timed(args, cwd, env):
+    output = subprocess.run(
+        [sys.executable, '-c'] + args, cwd=cwd, env=env,
+        check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--root', default=REPO_ROOT, help="checkout to measure")
+    args = parser.parse_args()
+    root = os.path.abspath(args.root)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Run against a scratch copy of the data so the checkout is untouched
+        shutil.copytree(os.path.join(root, 'data'), os.path.join(tmp, 'data'),
+                        ignore=shutil.ignore_patterns('*.db*', 'card_cache', 'photos'))
+        shutil.copy(os.path.join(root, 'alpha_tech_logo.png'), tmp)
+        env = dict(os.environ, PYTHONPATH=root, PYTHONDONTWRITEBYTECODE='')
+
+        scenarios = [
+            ("cli.py --help", [WALL_CLOCK, sys.executable, os.path.join(root, 'cli.py'), '--help']),
+            ("import + first card", [FIRST_CARD]),
+            ("app first run", [APP_FIRST_RUN, os.path.join(root, 'app.py')]),
+        ]
+        print(f"{root}, median of {args.runs} runs")
+        for label, command in scenarios:
+            times = [timed(command, tmp, env) for _ in range(args.runs)]
+            print(f"{label:<22} {statistics.median(times) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Hot-path benchmark suite over synthetic rosters and attendance histories.
+
+For each roster size a synthetic employee pickle is written, with photos
+drawn from a small pool of random-noise JPEGs (noise is the worst case for
+the JPEG decoder), plus an attendance history of two punches per
+employee per day. Every hot path is timed without tracing, then run again
+under tracemalloc to record its peak allocation. Results are printed as a
+table and, with --json, written as machine-readable JSON so runs can be
+compared across revisions.
+
+Run from the repository root:
+
+    python benchmarks/bench_suite.py --sizes 100 1000 10000 --json results.json
+    python benchmarks/bench_suite.py --sizes 100000 --days 5 --json -
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import PIL
+from PIL import Image
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import card_renderer  # noqa: E402
+import photo_pipeline  # noqa: E402
+from attendance_ingest import SHIFT_STARTS, AttendanceIngestor  # noqa: E402
+from storage import EMPLOYEE_COLUMNS, AttendanceStore, EmployeeStore  # noqa: E402
+
+ROLES = ['Software Engineer', 'Developer', 'Designer', 'Manager', 'Analyst']
+CITIES = ['Lahore', 'Karachi', 'Islamabad', 'Peshawar']
+
+# Camera-sized originals exercise the crop path; card-sized ones the fast path
+PHOTO_SIZES = [(1200, 1600), (3024, 4032), (1600, 1200), card_renderer.PHOTO_SIZE]
+
+
+def synthetic_photos(photo_dir, count, seed=0):
+    """Random-noise JPEGs in a mix of camera and card sizes"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(photo_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        width, height = PHOTO_SIZES[i % len(PHOTO_SIZES)]
+        pixels = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        path = os.path.join(photo_dir, f"photo_{i:03d}.jpg")
+        Image.fromarray(pixels).save(path, format='JPEG', quality=85)
+        paths.append(path)
+    return paths
+
+
+def synthetic_roster(count, photos, seed=0):
+    """Employee frame with ``count`` rows; most employees get a pool photo"""
+    rng = np.random.default_rng(seed)
+    shifts = list(SHIFT_STARTS)
+    ids = [f"AT-{i:06d}" for i in range(1, count + 1)]
+    photo_choice = rng.integers(0, len(photos), count)
+    has_photo = rng.random(count) < 0.8
+    return pd.DataFrame({
+        'Unique ID': ids,
+        'Name': [f"Employee {i}" for i in range(1, count + 1)],
+        'CNIC': [f"35202-{i:07d}-{i % 10}" for i in range(1, count + 1)],
+        'Age': rng.integers(20, 60, count),
+        'Role': rng.choice(ROLES, count),
+        'City': rng.choice(CITIES, count),
+        'Shift': [shifts[i % len(shifts)] for i in range(count)],
+        'Photo': [photos[p] if keep else None for p, keep in zip(photo_choice, has_photo)],
+    }, columns=EMPLOYEE_COLUMNS)
+
+
+def synthetic_history(roster, days, seed=0):
+    """(unique_id, name, timestamp, kind) punches: one in and one out per employee per day"""
+    rng = np.random.default_rng(seed)
+    first_day = datetime.combine(datetime.now().date(), datetime.min.time()) - timedelta(days=days + 2)
+    starts = roster['Shift'].map(SHIFT_STARTS).tolist()
+    ids = roster['Unique ID'].tolist()
+    names = roster['Name'].tolist()
+    for day in range(days):
+        base = first_day + timedelta(days=day)
+        arrive = rng.normal(-5, 10, len(ids))
+        stay = rng.normal(8 * 60, 20, len(ids))
+        day_punches = []
+        for uid, name, start, a, s in zip(ids, names, starts, arrive, stay):
+            check_in = base + start + timedelta(minutes=float(a))
+            day_punches.append((uid, name, check_in, 'in'))
+            day_punches.append((uid, name, check_in + timedelta(minutes=float(s)), 'out'))
+        day_punches.sort(key=lambda punch: punch[2])
+        yield day_punches
+
+
+def photo_size(path):
+    with Image.open(path) as image:
+        return image.size
+
+
+class Suite:
+    """Runs cases and collects their results"""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.results = []
+
+    def run(self, case, roster, func, iterations, memory_iterations=3):
+        """Time ``func(i)`` for ``iterations`` calls, then trace a few for peak memory"""
+        times = []
+        for i in range(iterations):
+            started = time.perf_counter()
+            func(i)
+            times.append(time.perf_counter() - started)
+
+        peak_kb = None
+        if self.memory:
+            # A separate pass: tracemalloc slows allocation-heavy code down
+            tracemalloc.start()
+            for i in range(min(iterations, memory_iterations)):
+                func(iterations + i)
+            peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+
+        ms = np.array(times) * 1000
+        result = {
+            'case': case,
+            'roster': roster,
+            'iterations': iterations,
+            'mean_ms': float(ms.mean()),
+            'p50_ms': float(np.percentile(ms, 50)),
+            'p95_ms': float(np.percentile(ms, 95)),
+            'peak_kb': peak_kb,
+        }
+        self.results.append(result)
+        peak = f"{peak_kb:10.0f} KiB" if peak_kb is not None else ""
+        print(f"{case:<32} {roster if roster is not None else '-':>7} "
+              f"{iterations:6d}x {result['mean_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms  {peak}",
+              file=sys.stderr)
+        return result
+
+
+def run_render_cases(suite, photos, iterations, logo_path):
+    """Roster-independent card and QR paths"""
+    sample = synthetic_roster(iterations, photos).to_dict('records')
+    normalized = [path for path in photos if photo_size(path) == card_renderer.PHOTO_SIZE]
+    legacy = [path for path in photos if path not in normalized]
+
+    # Warm fonts, logo and template so each case measures its steady state
+    card_renderer.preload(logo_path)
+
+    suite.run('generate_qr_code', None,
+              lambda i: card_renderer.generate_qr_code(sample[i % len(sample)]), iterations)
+
+    # Decode one photo of each camera size up front so only the crop is timed
+    decoded = []
+    for path in legacy[:len(PHOTO_SIZES) - 1]:
+        with Image.open(path) as image:
+            decoded.append(image.convert('RGB'))
+    suite.run('crop_to_aspect', None,
+              lambda i: card_renderer.crop_to_aspect(decoded[i % len(decoded)], *card_renderer.PHOTO_SIZE),
+              iterations)
+    del decoded
+
+    def render(photo_paths):
+        def call(i):
+            # Fresh QR each call, as for a roster rendered for the first time
+            card_renderer.qr_image_cache.clear()
+            employee = sample[i % len(sample)]
+            card_renderer.create_employee_card(
+                employee, logo_path, photo_paths[i % len(photo_paths)] if photo_paths else None
+            )
+        return call
+    suite.run('create_employee_card (no photo)', None, render(None), iterations)
+    suite.run('create_employee_card (camera)', None, render(legacy), iterations)
+    suite.run('create_employee_card (ingested)', None, render(normalized), iterations)
+    suite.run('normalize_photo', None,
+              lambda i: photo_pipeline.normalize_photo(legacy[i % len(legacy)]), iterations)
+
+
+def run_roster_cases(suite, tmp, size, photos, days, iterations):
+    """Employee store and attendance paths for one roster size"""
+    roster = synthetic_roster(size, photos)
+    path = os.path.join(tmp, f"employees_{size}.pkl")
+    with open(path, 'wb') as f:
+        pickle.dump(roster, f)
+
+    suite.run('employee_store.load', size, lambda i: EmployeeStore(path), max(3, iterations // 20))
+
+    store = EmployeeStore(path)
+    ids = roster['Unique ID'].tolist()
+    suite.run('employee_store.get', size, lambda i: store.get(ids[i * 7919 % size]), iterations)
+
+    def add(i):
+        store.add({**roster.iloc[0].to_dict(),
+                   'Unique ID': f"BX-{size}-{i:06d}", 'CNIC': f"61101-{i:07d}-{size % 10}"})
+    suite.run('employee_store.add (save)', size, add, max(3, iterations // 20))
+    suite.run('employee_store.to_dataframe', size, lambda i: store.to_dataframe(), 5)
+
+    db_path = os.path.join(tmp, f"attendance_{size}.db")
+    attendance = AttendanceStore(db_path)
+    started = time.perf_counter()
+    for day_punches in synthetic_history(roster, days):
+        attendance.append_many(day_punches)
+    print(f"{'(history written)':<32} {size:>7} {attendance.count():8d} rows in "
+          f"{time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+    # The Admin tab's path: debounce, classify and write each scan at once
+    shift_of = dict(zip(ids, roster['Shift'])).get
+    ingestor = AttendanceIngestor(attendance, shift_of=shift_of, window=0)
+    names = roster['Name'].tolist()
+
+    def record(i):
+        position = i * 7919 % size
+        ingestor.submit(ids[position], names[position])
+        ingestor.flush()
+    suite.run('record_attendance', size, record, iterations)
+
+    end = datetime.now()
+    start = end - timedelta(days=days + 3)
+    suite.run('attendance.daily_aggregates', size,
+              lambda i: attendance.daily_aggregates(start, end), 3)
+    suite.run('attendance.query (one employee)', size,
+              lambda i: attendance.query(start, end, [ids[i % size]]), 10)
+    attendance.close()
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+            check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--days', type=int, default=20, help="days of attendance history")
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--photos', type=int, default=12, help="size of the random photo pool")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--json', help="write results to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    suite = Suite(memory=not args.no_memory)
+    with tempfile.TemporaryDirectory() as tmp:
+        logo_path = os.path.join(REPO_ROOT, card_renderer.DEFAULT_LOGO_PATH)
+        photos = synthetic_photos(os.path.join(tmp, 'photos'), args.photos)
+        run_render_cases(suite, photos, args.iterations, logo_path)
+        for size in args.sizes:
+            run_roster_cases(suite, tmp, size, photos, args.days, args.iterations)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pillow': PIL.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args),
+        },
+        'results': suite.results,
+    }
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.json}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import card_renderer
+import profiling
+import qr_payload
+
+
+# Content hashes of files, memoized by (path, size, mtime) so unchanged
+# photos and logos are not re-read on every Streamlit rerun
+_file_hashes = {}
+_file_hashes_lock = threading.Lock()
+
+
+def file_fingerprint(path):
+    """Content hash of a file, or None when there is no such file"""
+    if not (isinstance(path, str) and os.path.exists(path)):
+        return None
+
+    stat = os.stat(path)
+    stat_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        digest = _file_hashes.get(stat_key)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with _file_hashes_lock:
+            _file_hashes[stat_key] = digest
+    return digest
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def card_fingerprint(employee_data, logo_path, photo_path):
+    """Hash of each input a card is drawn from, by dependency.
+
+    Covers the renderer's template version, the logo and photo contents,
+    the employee fields printed on the card and the QR payload (which
+    changes with the signing key) with its symbol size. Two renders with
+    equal fingerprints produce the same card.
+    """
+    if not (isinstance(logo_path, str) and os.path.exists(logo_path)):
+        # The renderer falls back to the default logo
+        logo_path = card_renderer.DEFAULT_LOGO_PATH
+    row = {label: str(employee_data.get(label)) for label in card_renderer.DETAIL_LABELS}
+    payload = qr_payload.encode_payload(employee_data['Unique ID'])
+    return {
+        'template': card_renderer.TEMPLATE_VERSION,
+        'logo': file_fingerprint(logo_path),
+        'photo': file_fingerprint(photo_path),
+        'row': _digest(row),
+        'qr': _digest([card_renderer.QR_VERSION, card_renderer.QR_SIZE, payload]),
+    }
+
+
+def card_key(employee_data, logo_path, photo_path):
+    """Content address of a rendered card, derived from its fingerprint"""
+    return _digest(card_fingerprint(employee_data, logo_path, photo_path))
+
+
+class RenderedCardCache:
+    """Size-bounded, content-addressed cache of rendered card PNGs on disk.
+
+    Entries are evicted least-recently-used first once the total size goes
+    over ``max_bytes``. The cache directory is shared by every session and
+    survives restarts.
+    """
+
+    def __init__(self, cache_dir='data/card_cache', max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._total_bytes = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+        self._evict()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def _load_index(self):
+        """Rebuild the LRU order from file modification times"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.png'):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((stat.st_mtime, name[:-4], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        """Return cached PNG bytes for ``key`` or None"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+            # Keep the on-disk LRU order in sync for the next process
+            os.utime(self._path(key))
+        except OSError:
+            with self._lock:
+                self._total_bytes -= self._entries.pop(key, 0)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Store PNG bytes under ``key`` and evict old entries if needed"""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+        self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until within ``max_bytes``"""
+        evicted = []
+        with self._lock:
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def get_or_render(self, employee_data, logo_path, photo_path, on_error=None):
+        """Return the card PNG for an employee, rendering it only on a miss"""
+        with profiling.span('cache.lookup'):
+            key = card_key(employee_data, logo_path, photo_path)
+            data = self.get(key)
+        if data is None:
+            card = card_renderer.create_employee_card(
+                employee_data, logo_path, photo_path, on_error=on_error
+            )
+            data = card_renderer.encode_png(card)
+            with profiling.span('cache.store'):
+                self.put(key, data)
+        return data
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+            }
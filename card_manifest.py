@@ -0,0 +1,116 @@
+"""Track which exported cards are out of date.
+
+A directory of exported card PNGs keeps a ``manifest.json`` recording,
+for each employee, the file written and the fingerprint of every input it
+was drawn from (see ``card_cache.card_fingerprint``). Comparing the
+manifest with the current roster, logo and photos gives the cards that
+need rebuilding and why, so a logo swap or an edited employee only
+re-renders the affected cards.
+"""
+import json
+import os
+from collections import Counter, namedtuple
+
+from card_cache import card_fingerprint, card_key
+
+
+MANIFEST_NAME = 'manifest.json'
+FINGERPRINT_FIELDS = ('template', 'logo', 'photo', 'row', 'qr')
+
+StaleCard = namedtuple('StaleCard', 'employee fingerprint reasons')
+RebuildPlan = namedtuple('RebuildPlan', 'stale unchanged removed')
+
+
+def _photo_path(employee):
+    photo = employee.get('Photo')
+    return photo if isinstance(photo, str) and os.path.exists(photo) else None
+
+
+def load_manifest(output_dir):
+    """Unique ID -> {'file', 'fingerprint'} for cards exported to ``output_dir``"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def plan_rebuild(employees, logo_path, output_dir, filename=None):
+    """Compare employee records with the manifest in ``output_dir``.
+
+    Returns a RebuildPlan: ``stale`` holds a StaleCard per card to render
+    with the reasons ('new', 'missing file' or the changed fingerprint
+    fields), ``unchanged`` counts up-to-date cards and ``removed`` lists
+    manifest entries for employees no longer in the roster.
+    """
+    manifest = load_manifest(output_dir)
+    stale = []
+    unchanged = 0
+    seen = set()
+    for employee in employees:
+        unique_id = str(employee['Unique ID'])
+        seen.add(unique_id)
+        fingerprint = card_fingerprint(employee, logo_path, _photo_path(employee))
+        entry = manifest.get(unique_id)
+        if entry is None:
+            reasons = ['new']
+        elif not os.path.exists(os.path.join(output_dir, entry['file'])):
+            reasons = ['missing file']
+        else:
+            reasons = [field for field in FINGERPRINT_FIELDS
+                       if entry['fingerprint'].get(field) != fingerprint[field]]
+            if not reasons and filename and entry['file'] != filename(employee):
+                reasons = ['file name']
+        if reasons:
+            stale.append(StaleCard(employee, fingerprint, reasons))
+        else:
+            unchanged += 1
+    removed = sorted(unique_id for unique_id in manifest if unique_id not in seen)
+    return RebuildPlan(stale, unchanged, removed)
+
+
+def summarize(plan):
+    """Number of stale cards per reason, e.g. {'logo': 120, 'row': 3}"""
+    return Counter(reason for card in plan.stale for reason in card.reasons)
+
+
+def apply_rebuild(output_dir, plan, filename):
+    """Record rebuilt cards in the manifest and delete files that were replaced or removed.
+
+    Call after the stale cards in ``plan`` have been written.
+    """
+    manifest = load_manifest(output_dir)
+    obsolete = []
+    for card in plan.stale:
+        unique_id = str(card.employee['Unique ID'])
+        new_file = filename(card.employee)
+        old = manifest.get(unique_id)
+        if old is not None and old['file'] != new_file:
+            # The card was renamed, e.g. after a name change
+            obsolete.append(old['file'])
+        manifest[unique_id] = {'file': new_file, 'fingerprint': card.fingerprint}
+    for unique_id in plan.removed:
+        obsolete.append(manifest.pop(unique_id)['file'])
+
+    for name in obsolete:
+        try:
+            os.remove(os.path.join(output_dir, name))
+        except OSError:
+            pass
+    save_manifest(output_dir, manifest)
+
+
+def stale_in_cache(employees, logo_path, card_cache):
+    """Employee records whose current card is not in a RenderedCardCache"""
+    return [
+        employee for employee in employees
+        if card_key(employee, logo_path, _photo_path(employee)) not in card_cache
+    ]
@@ -0,0 +1,310 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+import assets
+import profiling
+import qr_payload
+from qr_cache import QRImageCache
+
+
+logger = logging.getLogger(__name__)
+
+# Card dimensions
+CARD_WIDTH, CARD_HEIGHT = 1054, 640
+
+# Card Design Colors
+PRIMARY_COLOR = (31, 97, 141)  # Dark Blue
+
+DEFAULT_LOGO_PATH = assets.DEFAULT_LOGO_PATH
+
+# Bump whenever the card layout changes so cached renders are invalidated
+TEMPLATE_VERSION = 3
+
+# Title, label and data text sizes
+FONT_SIZES = (40, 30, 35)
+
+# Compact payloads fit a version 2 symbol with medium error correction
+QR_VERSION = 2
+QR_SIZE = 200
+
+
+def _report(on_error, message):
+    """Send a rendering problem to the caller's error sink"""
+    if on_error is not None:
+        on_error(message)
+    else:
+        logger.warning(message)
+
+
+def _build_qr(payload):
+    # Imported on first use so importing the renderer stays cheap
+    import qrcode
+    from qrcode.exceptions import DataOverflowError
+
+    qr = qrcode.QRCode(
+        version=QR_VERSION,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(payload)
+    try:
+        qr.make(fit=False)
+    except DataOverflowError:
+        # Unusually long IDs get a larger symbol instead of failing
+        qr.make(fit=True)
+
+    return qr.make_image(fill_color="black", back_color="white")
+
+
+def generate_qr_code(employee_data):
+    """Generate QR code with the employee's compact signed payload"""
+    return _build_qr(qr_payload.encode_payload(employee_data['Unique ID']))
+
+
+def _render_qr_bitmap(payload):
+    """QR code scaled to the size it is pasted on the card"""
+    return _build_qr(payload).resize((QR_SIZE, QR_SIZE))
+
+
+# Set EMPLOYEE_QR_CACHE_DIR to also keep QR bitmaps on disk across processes
+qr_image_cache = QRImageCache(
+    _render_qr_bitmap,
+    cache_dir=os.environ.get('EMPLOYEE_QR_CACHE_DIR'),
+    namespace=f"v{QR_VERSION}-{QR_SIZE}",
+)
+
+
+def card_qr_image(employee_data):
+    """The card's 200x200 QR bitmap, memoized by payload"""
+    return qr_image_cache.get(qr_payload.encode_payload(employee_data['Unique ID']))
+
+
+def crop_to_aspect(image, target_width, target_height):
+    """Crop image to specified aspect ratio and resize"""
+    img_ratio = image.width / image.height
+    target_ratio = target_width / target_height
+
+    if img_ratio > target_ratio:
+        new_height = image.height
+        new_width = int(new_height * target_ratio)
+        left = (image.width - new_width) // 2
+        top = 0
+    else:
+        new_width = image.width
+        new_height = int(new_width / target_ratio)
+        left = 0
+        top = (image.height - new_height) // 2
+
+    cropped = image.crop((left, top, left+new_width, top+new_height))
+    return cropped.resize((target_width, target_height))
+
+
+# Static card layers keyed by logo identity, most recently used last
+_template_cache = OrderedDict()
+_template_lock = threading.Lock()
+TEMPLATE_CACHE_SIZE = 8
+
+DETAIL_LABELS = ['Name', 'CNIC', 'Age', 'Role', 'Unique ID', 'City', 'Shift']
+DETAILS_START_Y = 150
+DETAILS_SPACING = 60
+DETAILS_VALUE_X = 200
+PHOTO_BOX = (CARD_WIDTH-350, 150, CARD_WIDTH-50, 450)
+PHOTO_SIZE = (300, 400)
+QR_POSITION = ((CARD_WIDTH - QR_SIZE) // 2, CARD_HEIGHT-250)  # Center at bottom
+FOOTER_Y = CARD_HEIGHT-50
+
+
+def open_photo(source):
+    """Open a photo, letting large JPEGs decode at a reduced scale.
+
+    ``draft`` makes the JPEG decoder skip detail that the resize to card
+    size would throw away, so a 12MP phone photo decodes at a fraction of
+    the cost.
+    """
+    photo = Image.open(source)
+    if photo.format == 'JPEG':
+        # Square request keeps either orientation at least card-sized
+        side = max(PHOTO_SIZE)
+        photo.draft('RGB', (side, side))
+    return photo
+
+
+def _load_fonts():
+    """Title, label and data fonts from the process-wide asset registry"""
+    return tuple(assets.font(size) for size in FONT_SIZES)
+
+
+def _value_x(label_font):
+    """Left edge of the values, pushed right if the labels are wider than planned"""
+    widest = max(label_font.getlength(f"{label}:") for label in DETAIL_LABELS)
+    return max(DETAILS_VALUE_X, 50 + int(widest) + 15)
+
+
+def preload(logo_path=DEFAULT_LOGO_PATH):
+    """Load fonts and the logo and build the card template ahead of the first card"""
+    assets.preload(FONT_SIZES, logo_path)
+    get_card_template(logo_path)
+
+
+def _logo_source(logo_path):
+    """Return ``(cache_key, source)`` for the logo that will be drawn.
+
+    Files are keyed by path, size and mtime so replacing the logo on disk
+    invalidates the cached template; uploads are keyed by their content.
+    """
+    if hasattr(logo_path, 'read'):
+        position = logo_path.tell() if hasattr(logo_path, 'tell') else 0
+        content = logo_path.read()
+        logo_path.seek(position)
+        return ('upload', hashlib.sha1(content).hexdigest()), io.BytesIO(content)
+
+    if not (isinstance(logo_path, str) and os.path.exists(logo_path)):
+        # Use default logo if available
+        logo_path = DEFAULT_LOGO_PATH
+        if not os.path.exists(logo_path):
+            return ('missing',), None
+
+    stat = os.stat(logo_path)
+    return ('file', os.path.abspath(logo_path), stat.st_size, stat.st_mtime_ns), logo_path
+
+
+def _draw_photo_placeholder(draw, label_font):
+    draw.rectangle(list(PHOTO_BOX), fill='lightgray', outline='black')
+    draw.text((CARD_WIDTH-250, 300), "PHOTO", fill='gray', font=label_font)
+
+
+def _build_template(logo_source, on_error=None):
+    """Draw everything that is identical on every card"""
+    title_font, label_font, _ = _load_fonts()
+
+    # Create card background
+    template = Image.new('RGB', (CARD_WIDTH, CARD_HEIGHT), color='white')
+    draw = ImageDraw.Draw(template)
+
+    # Draw header
+    draw.rectangle([0, 0, CARD_WIDTH, 85], fill=PRIMARY_COLOR)
+    draw.text((240, 24), "ALPHA TECH EMPLOYEE CARD",
+              fill='white', font=title_font)
+
+    # Company logo - positioned to appear within the blue header
+    try:
+        if logo_source is None:
+            raise FileNotFoundError("Logo not found")
+        if isinstance(logo_source, str):
+            logo = assets.logo(logo_source)
+        else:
+            logo = assets.prepare_logo(logo_source)
+        template.paste(logo, (50, 2), logo)
+    except Exception as e:
+        _report(on_error, f"Error loading logo: {e}")
+
+    # Photo placeholder, covered per card when a photo is available
+    _draw_photo_placeholder(draw, label_font)
+
+    # Field labels
+    for i, label in enumerate(DETAIL_LABELS):
+        draw.text((50, DETAILS_START_Y + i*DETAILS_SPACING), f"{label}:",
+                  fill=PRIMARY_COLOR, font=label_font)
+
+    # Footer
+    draw.line([(0, FOOTER_Y), (CARD_WIDTH, FOOTER_Y)],
+              fill=PRIMARY_COLOR, width=5)
+
+    return template
+
+
+def get_card_template(logo_path, on_error=None):
+    """Return the cached static layer for ``logo_path``, building it if needed"""
+    key, source = _logo_source(logo_path)
+    with _template_lock:
+        template = _template_cache.get(key)
+        if template is not None:
+            _template_cache.move_to_end(key)
+            return template
+
+    template = _build_template(source, on_error)
+    with _template_lock:
+        _template_cache[key] = template
+        while len(_template_cache) > TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+    return template
+
+
+def clear_template_cache():
+    """Drop all cached templates (e.g. after changing fonts or colors)"""
+    with _template_lock:
+        _template_cache.clear()
+
+
+def create_employee_card(employee_data, logo_path, employee_photo=None, on_error=None):
+    """Create a professional employee card.
+
+    The card starts from a copy of the cached template, so only the
+    employee's values, photo and QR code are drawn per call. ``on_error``
+    receives a message for recoverable problems (missing logo, unreadable
+    photo); it defaults to logging a warning so the renderer can run
+    outside Streamlit.
+    """
+    _, label_font, data_font = _load_fonts()
+
+    with profiling.span('card.template'):
+        card = get_card_template(logo_path, on_error).copy()
+        draw = ImageDraw.Draw(card)
+
+    # Employee Photo
+    with profiling.span('card.photo'):
+        try:
+            if employee_photo is not None:
+                if isinstance(employee_photo, str) and os.path.exists(employee_photo):
+                    photo = open_photo(employee_photo)
+                elif hasattr(employee_photo, 'read'):
+                    photo = open_photo(employee_photo)
+                else:
+                    raise ValueError("Invalid photo format")
+
+                # Ingested photos are already card-sized; only legacy ones need cropping
+                if photo.size != PHOTO_SIZE:
+                    photo = crop_to_aspect(photo, *PHOTO_SIZE)
+                # Clear the template's placeholder before pasting the photo
+                draw.rectangle(list(PHOTO_BOX), fill='white')
+                card.paste(photo, (PHOTO_BOX[0], PHOTO_BOX[1]))
+        except Exception as e:
+            _report(on_error, f"Error loading employee photo: {e}")
+            _draw_photo_placeholder(draw, label_font)
+
+    # Employee Details - values next to the template's labels
+    with profiling.span('card.text'):
+        value_x = _value_x(label_font)
+        for i, label in enumerate(DETAIL_LABELS):
+            draw.text((value_x, DETAILS_START_Y + i*DETAILS_SPACING), str(employee_data[label]),
+                      fill='black', font=data_font)
+
+    # QR Code, reused from the cache when the payload is unchanged
+    with profiling.span('card.qr'):
+        card.paste(card_qr_image(employee_data), QR_POSITION)
+
+        # The QR code overlaps the footer line, so redraw that segment on top
+        draw.line([(QR_POSITION[0], FOOTER_Y), (QR_POSITION[0] + QR_SIZE, FOOTER_Y)],
+                  fill=PRIMARY_COLOR, width=5)
+
+    return card
+
+
+def encode_png(card):
+    """Encode a rendered card as PNG bytes"""
+    buf = io.BytesIO()
+    with profiling.span('card.encode'):
+        card.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def card_filename(employee_data):
+    """File name used for downloaded and exported cards"""
+    return f"{employee_data['Unique ID']}_{employee_data['Name']}_employee_card.png"
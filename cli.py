@@ -0,0 +1,440 @@
+import argparse
+import os
+import pickle
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import attendance_export
+import card_renderer
+import photo_pipeline
+import sheet_export
+from attendance_ingest import DEBOUNCE_SECONDS, AttendanceIngestor
+
+# pandas (via storage) and numpy (via qr_decoder) are imported by the
+# commands that need them, so --help and light commands start quickly
+
+
+def load_employees(source):
+    """Load employees from a CSV or Excel roster or the app's employees.pkl.
+
+    Roster headers are matched ignoring case, as for import-employees. A
+    source without the employee columns exits with a message.
+    """
+    import employee_import
+    from storage import EMPLOYEE_COLUMNS
+
+    try:
+        if source.lower().endswith(employee_import.ROSTER_EXTENSIONS):
+            employees = employee_import.read_roster(source)
+        else:
+            with open(source, 'rb') as f:
+                employees = pickle.load(f)
+    except (OSError, RuntimeError, ValueError) as e:
+        raise SystemExit(str(e))
+
+    missing = [c for c in EMPLOYEE_COLUMNS if c not in employees.columns and c != 'Photo']
+    if missing:
+        raise SystemExit(f"Roster is missing columns: {', '.join(missing)}")
+    if 'Photo' not in employees.columns:
+        employees['Photo'] = None
+    return employees
+
+
+def _render_chunk(records, logo_path, output_dir):
+    """Render a chunk of employees in a worker process.
+
+    Cards are written straight to ``output_dir`` when given, otherwise the
+    PNG bytes are returned so the parent can add them to a ZIP.
+    """
+    results = []
+    for employee in records:
+        photo = employee.get('Photo')
+        if not (isinstance(photo, str) and os.path.exists(photo)):
+            photo = None
+
+        card = card_renderer.create_employee_card(employee, logo_path, photo)
+        filename = card_renderer.card_filename(employee)
+
+        if output_dir:
+            card.save(os.path.join(output_dir, filename), format="PNG")
+            results.append((filename, None))
+        else:
+            results.append((filename, card_renderer.encode_png(card)))
+    return results
+
+
+def _chunks(records, size):
+    for i in range(0, len(records), size):
+        yield records[i:i + size]
+
+
+def render_cards(employees, logo_path, output_dir=None, zip_path=None,
+                 workers=None, chunk_size=25, progress=None):
+    """Render cards for every employee across a process pool.
+
+    Returns the number of rendered cards. ``progress`` is called with
+    ``(done, total, elapsed_seconds)`` after each finished chunk.
+    """
+    records = employees.to_dict('records')
+    total = len(records)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    done = 0
+    archive = zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) if zip_path else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_render_chunk, chunk, logo_path,
+                            None if archive else output_dir)
+                for chunk in _chunks(records, chunk_size)
+            ]
+            for future in as_completed(futures):
+                for filename, data in future.result():
+                    if archive is not None:
+                        # PNG is already compressed, so store without deflate
+                        archive.writestr(filename, data)
+                    done += 1
+                if progress:
+                    progress(done, total, time.perf_counter() - started)
+    finally:
+        if archive is not None:
+            archive.close()
+    return done
+
+
+def _print_progress(done, total, elapsed):
+    rate = done / elapsed if elapsed else 0.0
+    print(f"\r{done}/{total} cards  {rate:.1f} cards/s", end='', file=sys.stderr, flush=True)
+
+
+def cmd_render(args):
+    """Render employee cards without the Streamlit UI"""
+    if not args.output_dir and not args.zip:
+        raise SystemExit("Either --output-dir or --zip is required")
+
+    employees = load_employees(args.source)
+    started = time.perf_counter()
+    count = render_cards(
+        employees,
+        args.logo,
+        output_dir=None if args.zip else args.output_dir,
+        zip_path=args.zip,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        progress=None if args.quiet else _print_progress,
+    )
+    elapsed = time.perf_counter() - started
+    if not args.quiet:
+        print(file=sys.stderr)
+    rate = count / elapsed if elapsed else 0.0
+    print(f"Rendered {count} cards in {elapsed:.2f}s ({rate:.1f} cards/s)")
+
+
+def cmd_rebuild_cards(args):
+    """Re-render only the exported cards whose inputs changed since the last build"""
+    import card_manifest
+
+    employees = load_employees(args.source)
+    records = employees.to_dict('records')
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    plan = card_manifest.plan_rebuild(
+        records, args.logo, args.output_dir, filename=card_renderer.card_filename
+    )
+    reasons = card_manifest.summarize(plan)
+    print(f"{len(plan.stale)} of {len(records)} cards to rebuild, {plan.unchanged} up to date, "
+          f"{len(plan.removed)} to remove ({time.perf_counter() - started:.2f}s to check)")
+    for reason, count in reasons.most_common():
+        print(f"  {reason:<13} {count}")
+    if args.dry_run:
+        return
+
+    if plan.stale:
+        import pandas as pd
+
+        count = render_cards(
+            pd.DataFrame([card.employee for card in plan.stale]),
+            args.logo,
+            output_dir=args.output_dir,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            progress=None if args.quiet else _print_progress,
+        )
+        if not args.quiet:
+            print(file=sys.stderr)
+    else:
+        count = 0
+    card_manifest.apply_rebuild(args.output_dir, plan, card_renderer.card_filename)
+    elapsed = time.perf_counter() - started
+    print(f"Rebuilt {count} cards and removed {len(plan.removed)} in {elapsed:.2f}s")
+
+
+def cmd_decode(args):
+    """Decode card QR codes from an image, a folder or a ZIP of frames"""
+    import qr_decoder
+
+    results, elapsed = qr_decoder.decode_folder(args.source, workers=args.workers)
+
+    decoded = [(name, unique_id) for name, unique_id, error in results if not error]
+    for name, _, error in results:
+        if error:
+            print(f"{name}: {error}", file=sys.stderr)
+    for name, unique_id in decoded:
+        print(f"{name}\t{unique_id}")
+
+    rate = len(results) / elapsed if elapsed else 0.0
+    print(f"Decoded {len(decoded)}/{len(results)} images in {elapsed:.2f}s "
+          f"({rate:.1f} images/s)", file=sys.stderr)
+
+    if args.mark_attendance and decoded:
+        from storage import AttendanceStore, EmployeeRepository
+
+        employees = EmployeeRepository(load_employees(args.employees))
+        now = datetime.now()
+        punches = [
+            (unique_id, employees.get(unique_id)['Name'], now)
+            for _, unique_id in decoded if unique_id in employees
+        ]
+        def shift_of(unique_id):
+            return (employees.get(unique_id) or {}).get('Shift')
+
+        ingestor = AttendanceIngestor(
+            AttendanceStore(args.db, shift_of=shift_of),
+            shift_of=shift_of,
+            window=args.debounce
+        )
+        results = ingestor.submit_many(punches)
+        ingestor.flush()
+        accepted = sum(punch.accepted for punch in results)
+        print(f"Marked attendance for {accepted} scans "
+              f"({len(results) - accepted} repeat scans ignored)", file=sys.stderr)
+
+
+def cmd_ingest_photos(args):
+    """Convert existing employee photos into card-sized derivatives"""
+    from storage import EmployeeStore
+
+    employees = EmployeeStore(args.employees)
+
+    updates = []
+    for employee in employees.to_dataframe().to_dict('records'):
+        photo = employee.get('Photo')
+        if not (isinstance(photo, str) and os.path.exists(photo)):
+            continue
+        if photo_pipeline.is_normalized(photo):
+            continue
+        try:
+            path = photo_pipeline.ingest_photo(photo, employee['Unique ID'])
+        except Exception as e:
+            print(f"{employee['Unique ID']}: {e}", file=sys.stderr)
+            continue
+        updates.append((employee['Unique ID'], {'Photo': path}))
+
+    # One locked save, merged with any changes made while converting
+    if updates:
+        employees.update_many(updates)
+    print(f"Converted {len(updates)} photos into {photo_pipeline.PHOTO_DIR}")
+
+
+def cmd_import_employees(args):
+    """Add employees from a CSV or Excel roster in a single write"""
+    import employee_import
+    from storage import EmployeeStore
+
+    try:
+        roster = employee_import.read_roster(args.source)
+    except (RuntimeError, ValueError) as e:
+        raise SystemExit(str(e))
+
+    employees = EmployeeStore(args.employees)
+    started = time.perf_counter()
+    added, rejected = employee_import.import_roster(employees, roster)
+    print(f"Added {len(added)} employees in {time.perf_counter() - started:.2f}s, "
+          f"rejected {len(rejected)} rows")
+
+    if len(rejected):
+        if args.rejects:
+            rejected.to_csv(args.rejects, index=False)
+            print(f"Rejected rows written to {args.rejects}")
+        else:
+            for row, reason in zip(rejected['Row'], rejected['Reason']):
+                print(f"row {row}: {reason}", file=sys.stderr)
+
+    if added and args.render_dir:
+        import pandas as pd
+
+        count = render_cards(
+            pd.DataFrame(added), args.logo, output_dir=args.render_dir,
+            workers=args.workers, progress=None if args.quiet else _print_progress
+        )
+        if not args.quiet:
+            print(file=sys.stderr)
+        print(f"Rendered {count} cards to {args.render_dir}")
+
+
+def cmd_sheets(args):
+    """Export print-ready sheets of cards as a multi-page PDF or TIFF"""
+    employees = load_employees(args.source)
+    total = len(employees)
+    started = time.perf_counter()
+
+    def progress(done):
+        if not args.quiet:
+            _print_progress(done, total, time.perf_counter() - started)
+
+    # Build one employee dict at a time as pages are filled
+    records = (row.to_dict() for _, row in employees.iterrows())
+
+    cards, pages = sheet_export.export_sheets(
+        records, args.output, logo_path=args.logo, paper=args.paper,
+        dpi=args.dpi, progress=progress
+    )
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"Wrote {cards} cards on {pages} pages to {args.output} "
+          f"in {time.perf_counter() - started:.2f}s")
+
+
+def cmd_export_attendance(args):
+    """Export attendance to CSV, compressed CSV or Excel in bounded memory"""
+    from storage import AttendanceStore
+
+    unique_ids = list(args.employee) if args.employee else None
+    if args.shift:
+        employees = load_employees(args.employees)
+        on_shift = employees.loc[employees['Shift'].isin(args.shift), 'Unique ID'].tolist()
+        unique_ids = [u for u in unique_ids if u in on_shift] if unique_ids else on_shift
+
+    started = time.perf_counter()
+
+    def progress(done):
+        if not args.quiet:
+            elapsed = time.perf_counter() - started
+            rate = done / elapsed if elapsed else 0.0
+            print(f"\r{done} rows  {rate:,.0f} rows/s", end='', file=sys.stderr, flush=True)
+
+    store = AttendanceStore(args.db)
+    try:
+        rows, elapsed = attendance_export.export_attendance(
+            store, args.output, start=args.start, end=args.end, unique_ids=unique_ids,
+            chunk_size=args.chunk_size, progress=progress
+        )
+    except (RuntimeError, ValueError) as e:
+        raise SystemExit(str(e))
+    if not args.quiet:
+        print(file=sys.stderr)
+    rate = rows / elapsed if elapsed else 0.0
+    print(f"Exported {rows} rows to {args.output} in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Alpha Tech employee card tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    render = subparsers.add_parser('render', help=cmd_render.__doc__)
+    render.add_argument('--source', default='data/employees.pkl',
+                        help="employees.pkl data store or a CSV roster")
+    render.add_argument('--logo', default=card_renderer.DEFAULT_LOGO_PATH,
+                        help="company logo (default: %(default)s)")
+    render.add_argument('--output-dir', help="directory to write card PNGs to")
+    render.add_argument('--zip', help="write all cards into this ZIP file instead")
+    render.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    render.add_argument('--chunk-size', type=int, default=25,
+                        help="employees per worker task (default: %(default)s)")
+    render.add_argument('--quiet', action='store_true', help="no progress output")
+    render.set_defaults(func=cmd_render)
+
+    rebuild = subparsers.add_parser('rebuild-cards', help=cmd_rebuild_cards.__doc__)
+    rebuild.add_argument('output_dir', help="directory of exported card PNGs to keep up to date")
+    rebuild.add_argument('--source', default='data/employees.pkl',
+                         help="employees.pkl data store or a CSV roster")
+    rebuild.add_argument('--logo', default=card_renderer.DEFAULT_LOGO_PATH,
+                         help="company logo (default: %(default)s)")
+    rebuild.add_argument('--dry-run', action='store_true',
+                         help="only report how many cards would be rebuilt and why")
+    rebuild.add_argument('--workers', type=int, default=None,
+                         help="worker processes (default: CPU count)")
+    rebuild.add_argument('--chunk-size', type=int, default=25,
+                         help="employees per worker task (default: %(default)s)")
+    rebuild.add_argument('--quiet', action='store_true', help="no progress output")
+    rebuild.set_defaults(func=cmd_rebuild_cards)
+
+    decode = subparsers.add_parser('decode', help=cmd_decode.__doc__)
+    decode.add_argument('source', help="image file, folder of images or ZIP archive")
+    decode.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    decode.add_argument('--mark-attendance', action='store_true',
+                        help="record one punch per decoded employee in a single write")
+    decode.add_argument('--employees', default='data/employees.pkl',
+                        help="employee data store used to resolve names")
+    decode.add_argument('--db', default='data/attendance.db',
+                        help="attendance store (default: %(default)s)")
+    decode.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS,
+                        help="ignore repeat scans of a card within this many seconds "
+                             "(default: %(default)s)")
+    decode.set_defaults(func=cmd_decode)
+
+    ingest = subparsers.add_parser('ingest-photos', help=cmd_ingest_photos.__doc__)
+    ingest.add_argument('--employees', default='data/employees.pkl',
+                        help="employee data store to update (default: %(default)s)")
+    ingest.set_defaults(func=cmd_ingest_photos)
+
+    imports = subparsers.add_parser('import-employees', help=cmd_import_employees.__doc__)
+    imports.add_argument('source', help="roster .csv or .xlsx with Name, CNIC, Age, Role, "
+                                        "City and Shift columns")
+    imports.add_argument('--employees', default='data/employees.pkl',
+                         help="employee data store to add to (default: %(default)s)")
+    imports.add_argument('--rejects', help="write rejected rows and reasons to this CSV")
+    imports.add_argument('--render-dir', help="also render the new employees' cards here")
+    imports.add_argument('--logo', default=card_renderer.DEFAULT_LOGO_PATH,
+                         help="company logo (default: %(default)s)")
+    imports.add_argument('--workers', type=int, default=None,
+                         help="worker processes for --render-dir (default: CPU count)")
+    imports.add_argument('--quiet', action='store_true', help="no progress output")
+    imports.set_defaults(func=cmd_import_employees)
+
+    sheets = subparsers.add_parser('sheets', help=cmd_sheets.__doc__)
+    sheets.add_argument('output', help="output .pdf or .tiff file")
+    sheets.add_argument('--source', default='data/employees.pkl',
+                        help="employees.pkl data store or a CSV roster")
+    sheets.add_argument('--logo', default=card_renderer.DEFAULT_LOGO_PATH,
+                        help="company logo (default: %(default)s)")
+    sheets.add_argument('--paper', choices=sorted(sheet_export.PAPER_SIZES_MM), default='a4')
+    sheets.add_argument('--dpi', type=int, default=300)
+    sheets.add_argument('--quiet', action='store_true', help="no progress output")
+    sheets.set_defaults(func=cmd_sheets)
+
+    export = subparsers.add_parser('export-attendance', help=cmd_export_attendance.__doc__)
+    export.add_argument('output', help="output .csv, .csv.gz, .csv.bz2 or .xlsx file")
+    export.add_argument('--db', default='data/attendance.db',
+                        help="attendance store (default: %(default)s)")
+    export.add_argument('--start', help="first day to include (YYYY-MM-DD)")
+    export.add_argument('--end', help="last day to include (YYYY-MM-DD)")
+    export.add_argument('--employee', action='append',
+                        help="only this Unique ID (repeatable)")
+    export.add_argument('--shift', action='append', choices=['Morning', 'Afternoon', 'Night'],
+                        help="only employees on this shift (repeatable)")
+    export.add_argument('--employees', default='data/employees.pkl',
+                        help="employee data store used for --shift")
+    export.add_argument('--chunk-size', type=int, default=50000,
+                        help="rows read and written per chunk (default: %(default)s)")
+    export.add_argument('--quiet', action='store_true', help="no progress output")
+    export.set_defaults(func=cmd_export_attendance)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Bulk employee import from CSV or Excel rosters.
+
+Every row is validated with whole-column checks (CNIC format, age range,
+role and shift), rejected rows are reported with their reasons, and the
+accepted ones get their Unique IDs and are saved in a single write.
+"""
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+from storage import EMPLOYEE_COLUMNS, MAX_AGE, MIN_AGE, ROLES, SHIFTS, normalize_cnic
+
+# 35202-1234567-1, with or without the dashes
+CNIC_PATTERN = r'\d{5}-?\d{7}-?\d'
+
+REQUIRED_COLUMNS = ['Name', 'CNIC', 'Age', 'Role', 'City', 'Shift']
+ROSTER_EXTENSIONS = ('.csv', '.xlsx')
+
+ImportResult = namedtuple('ImportResult', 'added rejected')
+
+
+def read_roster(source, filename=None):
+    """Read a roster from a path or an uploaded file as strings.
+
+    ``filename`` picks the format for file objects without a usable name.
+    """
+    name = (filename or getattr(source, 'name', None) or str(source)).lower()
+    if name.endswith('.csv'):
+        roster = pd.read_csv(source, dtype=str, keep_default_na=False)
+    elif name.endswith('.xlsx'):
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Excel import requires openpyxl (pip install openpyxl)")
+        roster = pd.read_excel(source, dtype=str, keep_default_na=False)
+    else:
+        raise ValueError(f"Unsupported roster file {os.path.basename(name)!r}; "
+                         f"use one of {', '.join(ROSTER_EXTENSIONS)}")
+
+    # Accept headers in any case, e.g. "cnic" or "SHIFT"
+    canonical = {column.lower(): column for column in EMPLOYEE_COLUMNS}
+    roster.columns = [canonical.get(str(c).strip().lower(), str(c).strip()) for c in roster.columns]
+    missing = [c for c in REQUIRED_COLUMNS if c not in roster.columns]
+    if missing:
+        raise ValueError(f"Roster is missing columns: {', '.join(missing)}")
+    return roster
+
+
+def _canonical(values, choices):
+    """Map values to ``choices`` ignoring case; unknown values become NaN"""
+    lookup = {choice.lower(): choice for choice in choices}
+    return values.str.lower().map(lookup)
+
+
+def validate_roster(roster, existing_cnics=()):
+    """Split a roster into ``(valid, rejected)`` frames.
+
+    ``valid`` is in the employee layout without Unique IDs. ``rejected``
+    keeps the original columns plus ``Row`` (the line number in the file)
+    and ``Reason``. CNICs already in ``existing_cnics`` (normalized) or
+    repeated within the roster are rejected too.
+    """
+    text = roster[REQUIRED_COLUMNS].astype(str).apply(lambda column: column.str.strip())
+    cnic = text['CNIC'].map(normalize_cnic)
+    age = pd.to_numeric(text['Age'], errors='coerce')
+    role = _canonical(text['Role'], ROLES)
+    shift = _canonical(text['Shift'], SHIFTS)
+
+    checks = [
+        (text['Name'] == '', "name is empty"),
+        (~text['CNIC'].str.fullmatch(CNIC_PATTERN), "CNIC must look like 35202-1234567-1"),
+        (~age.between(MIN_AGE, MAX_AGE) | (age % 1 != 0),
+         f"age must be a whole number from {MIN_AGE} to {MAX_AGE}"),
+        (role.isna(), "unknown role"),
+        (shift.isna(), f"shift must be one of {', '.join(SHIFTS)}"),
+        (cnic.isin(set(existing_cnics) - {''}), "CNIC is already registered"),
+        (cnic.duplicated() & (cnic != ''), "CNIC appears earlier in the roster"),
+    ]
+    reasons = pd.Series('', index=roster.index)
+    for failed, message in checks:
+        failed = failed.fillna(True)
+        reasons = reasons.mask(failed, reasons + '; ' + message)
+    bad = reasons != ''
+
+    valid = pd.DataFrame({
+        'Unique ID': None,
+        'Name': text['Name'],
+        'CNIC': text['CNIC'],
+        'Age': age,
+        'Role': role,
+        'City': text['City'],
+        'Shift': shift,
+        'Photo': None,
+    }, columns=EMPLOYEE_COLUMNS)[~bad].astype({'Age': int})
+
+    rejected = roster[bad].copy()
+    # Header is line 1 of the file
+    rejected.insert(0, 'Row', rejected.index + 2)
+    rejected['Reason'] = reasons[bad].str[2:]
+    return valid, rejected.reset_index(drop=True)
+
+
+def import_roster(store, roster):
+    """Validate a roster and add its valid rows to an EmployeeStore in one write.
+
+    Returns an ImportResult with the added employee records (including
+    their new Unique IDs) and the rejected rows.
+    """
+    existing = store.to_dataframe()['CNIC'].map(normalize_cnic)
+    valid, rejected = validate_roster(roster, existing_cnics=existing)
+    added = store.add_many(valid.to_dict('records')) if len(valid) else []
+    return ImportResult(added, rejected)
@@ -0,0 +1,58 @@
+import io
+import os
+
+from PIL import Image, ImageOps
+
+import card_renderer
+
+
+PHOTO_DIR = 'data/photos'
+PHOTO_WIDTH, PHOTO_HEIGHT = card_renderer.PHOTO_SIZE
+
+
+def normalize_photo(source):
+    """Return the card-ready 300x400 RGB derivative of an uploaded photo"""
+    image = card_renderer.open_photo(source)
+    image = ImageOps.exif_transpose(image)
+
+    if image.mode in ('RGBA', 'LA', 'P'):
+        # Flatten transparency onto white rather than black
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    return card_renderer.crop_to_aspect(image, PHOTO_WIDTH, PHOTO_HEIGHT)
+
+
+def ingest_photo(source, unique_id, photo_dir=PHOTO_DIR):
+    """Normalize an uploaded photo and store it in the managed photo directory.
+
+    ``source`` may be a path, raw bytes or a file object such as a
+    Streamlit upload. Returns the path of the stored derivative.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    elif hasattr(source, 'seek'):
+        source.seek(0)
+
+    photo = normalize_photo(source)
+
+    os.makedirs(photo_dir, exist_ok=True)
+    path = os.path.join(photo_dir, f"{unique_id}.jpg")
+    tmp_path = f"{path}.tmp"
+    photo.save(tmp_path, format="JPEG", quality=90)
+    os.replace(tmp_path, path)
+    return path
+
+
+def is_normalized(path):
+    """Whether ``path`` already points at a managed card-size derivative"""
+    if not (isinstance(path, str) and os.path.exists(path)):
+        return False
+    if os.path.abspath(os.path.dirname(path)) != os.path.abspath(PHOTO_DIR):
+        return False
+    with Image.open(path) as image:
+        return image.size == (PHOTO_WIDTH, PHOTO_HEIGHT)
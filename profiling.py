@@ -0,0 +1,104 @@
+"""Opt-in timing spans for the card and attendance hot paths.
+
+Spans are free while profiling is off: ``span`` hands back a shared no-op
+context manager. Set ``EMPLOYEE_PROFILE=1`` (or call ``enable``) to record
+how long each named stage takes; timings are aggregated for the whole
+process and read back with ``stats``. ``profile_call`` runs one call under
+cProfile for a function-level breakdown.
+"""
+import cProfile
+import contextlib
+import io
+import os
+import pstats
+import threading
+import time
+
+
+PROFILE_ENV_VAR = 'EMPLOYEE_PROFILE'
+
+_enabled = os.environ.get(PROFILE_ENV_VAR, '') not in ('', '0')
+_lock = threading.Lock()
+# Stage name -> [count, total seconds, slowest seconds]
+_timings = {}
+_disabled = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def enable(flag=True):
+    """Turn span collection on or off for the whole process"""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled():
+    return _enabled
+
+
+def span(name):
+    """Context manager timing the ``name`` stage while profiling is on"""
+    if not _enabled:
+        return _disabled
+    return _Span(name)
+
+
+def record(name, seconds):
+    """Add one timing for ``name``"""
+    with _lock:
+        entry = _timings.get(name)
+        if entry is None:
+            _timings[name] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+
+def stats():
+    """Per-stage timings in milliseconds, slowest total first"""
+    with _lock:
+        rows = [
+            {
+                'Stage': name,
+                'Calls': count,
+                'Total ms': total * 1000,
+                'Mean ms': total * 1000 / count,
+                'Max ms': slowest * 1000,
+            }
+            for name, (count, total, slowest) in _timings.items()
+        ]
+    return sorted(rows, key=lambda row: row['Total ms'], reverse=True)
+
+
+def reset():
+    """Forget all recorded timings"""
+    with _lock:
+        _timings.clear()
+
+
+def profile_call(func, *args, limit=25, **kwargs):
+    """Run ``func`` under cProfile; returns ``(result, report)``.
+
+    The report lists the ``limit`` functions with the highest cumulative
+    time.
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+    return result, out.getvalue()
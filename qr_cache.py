@@ -0,0 +1,98 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+
+class QRImageCache:
+    """LRU cache of final QR bitmaps keyed by a hash of their payload.
+
+    ``render`` turns a payload into the bitmap pasted on the card. When
+    ``cache_dir`` is given, bitmaps are also kept there as PNGs so other
+    processes (CLI workers, restarts) can reuse them.
+    """
+
+    def __init__(self, render, max_entries=4096, cache_dir=None, namespace=''):
+        self.render = render
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._images = OrderedDict()
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, payload):
+        return hashlib.sha256(f"{self.namespace}\n{payload}".encode('utf-8')).hexdigest()
+
+    def get(self, payload):
+        """Return the bitmap for ``payload``, rendering it only on a miss"""
+        key = self._key(payload)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+
+        image = self._load(key)
+        if image is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            image = self.render(payload)
+            self._store(key, image)
+            with self._lock:
+                self.misses += 1
+
+        with self._lock:
+            self._images[key] = image
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+        return image
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, f"{key}.png")
+        try:
+            with Image.open(path) as image:
+                image.load()
+                return image
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key, image):
+        if not self.cache_dir:
+            return
+        path = os.path.join(self.cache_dir, f"{key}.png")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            image.save(tmp_path, format="PNG")
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Drop the in-memory entries and reset the counters"""
+        with self._lock:
+            self._images.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self._images),
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,652 @@
+"""Decoding of the QR codes printed on employee cards.
+
+The built-in decoder is pure NumPy and handles upright or rotated, evenly
+lit codes such as uploaded card PNGs and screenshots. Camera frames with
+perspective or uneven lighting are passed on to OpenCV or pyzbar when
+either is installed.
+"""
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+from PIL import Image
+from qrcode.base import rs_blocks
+from qrcode.util import BCH_type_info, pattern_position
+
+import qr_payload
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp')
+
+# Batches smaller than this are decoded inline rather than in a process pool
+PARALLEL_THRESHOLD = 32
+
+
+class QRDecodeError(Exception):
+    """Raised when an image does not contain a readable QR code"""
+
+
+# --- Reed-Solomon over GF(256) with the QR primitive polynomial 0x11d ---
+
+_GF_EXP = [0] * 512
+_GF_LOG = [0] * 256
+_x = 1
+for _i in range(255):
+    _GF_EXP[_i] = _x
+    _GF_LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x100:
+        _x ^= 0x11d
+for _i in range(255, 512):
+    _GF_EXP[_i] = _GF_EXP[_i - 255]
+
+
+def _gf_mul(x, y):
+    if x == 0 or y == 0:
+        return 0
+    return _GF_EXP[_GF_LOG[x] + _GF_LOG[y]]
+
+
+def _gf_div(x, y):
+    if x == 0:
+        return 0
+    return _GF_EXP[(_GF_LOG[x] + 255 - _GF_LOG[y]) % 255]
+
+
+def _gf_pow(x, power):
+    return _GF_EXP[(_GF_LOG[x] * power) % 255]
+
+
+def _poly_scale(p, x):
+    return [_gf_mul(c, x) for c in p]
+
+
+def _poly_add(p, q):
+    r = [0] * max(len(p), len(q))
+    for i, c in enumerate(p):
+        r[i + len(r) - len(p)] = c
+    for i, c in enumerate(q):
+        r[i + len(r) - len(q)] ^= c
+    return r
+
+
+def _poly_mul(p, q):
+    r = [0] * (len(p) + len(q) - 1)
+    for j, qc in enumerate(q):
+        for i, pc in enumerate(p):
+            r[i + j] ^= _gf_mul(pc, qc)
+    return r
+
+
+def _poly_eval(p, x):
+    y = p[0]
+    for c in p[1:]:
+        y = _gf_mul(y, x) ^ c
+    return y
+
+
+def _poly_div(dividend, divisor):
+    out = list(dividend)
+    for i in range(len(dividend) - len(divisor) + 1):
+        coef = out[i]
+        if coef:
+            for j in range(1, len(divisor)):
+                if divisor[j]:
+                    out[i + j] ^= _gf_mul(divisor[j], coef)
+    sep = -(len(divisor) - 1)
+    return out[:sep], out[sep:]
+
+
+def rs_correct(codewords, nsym):
+    """Correct up to ``nsym // 2`` byte errors in a Reed-Solomon block"""
+    msg = list(codewords)
+    # Syndromes with a leading zero so synd[k] is the k-th syndrome, 1-based
+    synd = [0] + [_poly_eval(msg, _gf_pow(2, i)) for i in range(nsym)]
+    if not any(synd):
+        return msg
+
+    # Berlekamp-Massey error locator
+    err_loc, old_loc = [1], [1]
+    for i in range(1, nsym + 1):
+        delta = synd[i]
+        for j in range(1, len(err_loc)):
+            delta ^= _gf_mul(err_loc[-(j + 1)], synd[i - j])
+        old_loc = old_loc + [0]
+        if delta:
+            if len(old_loc) > len(err_loc):
+                new_loc = _poly_scale(old_loc, delta)
+                old_loc = _poly_scale(err_loc, _gf_div(1, delta))
+                err_loc = new_loc
+            err_loc = _poly_add(err_loc, _poly_scale(old_loc, delta))
+    while err_loc and err_loc[0] == 0:
+        err_loc.pop(0)
+    errors = len(err_loc) - 1
+    if errors * 2 > nsym:
+        raise QRDecodeError("Too many errors to correct")
+
+    # Chien search for the error positions
+    reversed_loc = err_loc[::-1]
+    n = len(msg)
+    err_pos = [n - 1 - i for i in range(n) if _poly_eval(reversed_loc, _gf_pow(2, i)) == 0]
+    if len(err_pos) != errors:
+        raise QRDecodeError("Could not locate errors")
+
+    # Forney algorithm for the error magnitudes
+    coef_pos = [n - 1 - p for p in err_pos]
+    locator = [1]
+    for p in coef_pos:
+        locator = _poly_mul(locator, _poly_add([1], [_gf_pow(2, p), 0]))
+    _, evaluator = _poly_div(_poly_mul(synd[::-1], locator), [1] + [0] * len(locator))
+    evaluator = evaluator[::-1]
+
+    xs = [_gf_pow(2, p) for p in coef_pos]
+    for i, xi in enumerate(xs):
+        xi_inv = _gf_div(1, xi)
+        denominator = 1
+        for j, xj in enumerate(xs):
+            if j != i:
+                denominator = _gf_mul(denominator, 1 ^ _gf_mul(xi_inv, xj))
+        y = _gf_mul(xi, _poly_eval(evaluator[::-1], xi_inv))
+        msg[err_pos[i]] ^= _gf_div(y, denominator)
+
+    if any(_poly_eval(msg, _gf_pow(2, i)) for i in range(nsym)):
+        raise QRDecodeError("Uncorrectable codeword block")
+    return msg
+
+
+# --- Symbol layout ---
+
+_MASKS = [
+    lambda i, j: (i + j) % 2 == 0,
+    lambda i, j: i % 2 == 0,
+    lambda i, j: j % 3 == 0,
+    lambda i, j: (i + j) % 3 == 0,
+    lambda i, j: (i // 2 + j // 3) % 2 == 0,
+    lambda i, j: (i * j) % 2 + (i * j) % 3 == 0,
+    lambda i, j: ((i * j) % 2 + (i * j) % 3) % 2 == 0,
+    lambda i, j: ((i * j) % 3 + (i + j) % 2) % 2 == 0,
+]
+
+_ALPHANUMERIC = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:'
+
+
+def _function_modules(version):
+    """Boolean map of finder, timing, alignment, format and version modules"""
+    size = version * 4 + 17
+    reserved = np.zeros((size, size), dtype=bool)
+
+    # Finder patterns with separators and format information
+    reserved[:9, :9] = True
+    reserved[:9, size - 8:] = True
+    reserved[size - 8:, :9] = True
+
+    # Timing patterns
+    reserved[6, :] = True
+    reserved[:, 6] = True
+
+    # Alignment patterns, skipping the three that would overlap a finder
+    positions = pattern_position(version)
+    corners = {(6, 6), (6, size - 7), (size - 7, 6)}
+    for r in positions:
+        for c in positions:
+            if (r, c) not in corners:
+                reserved[r - 2:r + 3, c - 2:c + 3] = True
+
+    # Version information
+    if version >= 7:
+        reserved[:6, size - 11:size - 8] = True
+        reserved[size - 11:size - 8, :6] = True
+
+    return reserved
+
+
+def _read_format(matrix):
+    """Return ``(error_correction, mask)`` from the format information"""
+    size = len(matrix)
+    vertical = 0
+    horizontal = 0
+    for i in range(15):
+        # Mirrors the placement in qrcode.main.QRCode.setup_type_info
+        if i < 6:
+            v = matrix[i, 8]
+        elif i < 8:
+            v = matrix[i + 1, 8]
+        else:
+            v = matrix[size - 15 + i, 8]
+        if i < 8:
+            h = matrix[8, size - i - 1]
+        elif i < 9:
+            h = matrix[8, 15 - i]
+        else:
+            h = matrix[8, 14 - i]
+        vertical |= int(v) << i
+        horizontal |= int(h) << i
+
+    best, best_distance = None, 16
+    for error_correction in range(4):
+        for mask in range(8):
+            expected = BCH_type_info((error_correction << 3) | mask)
+            distance = min(bin(expected ^ vertical).count('1'),
+                           bin(expected ^ horizontal).count('1'))
+            if distance < best_distance:
+                best, best_distance = (error_correction, mask), distance
+    if best_distance > 3:
+        raise QRDecodeError("Unreadable format information")
+    return best
+
+
+def _read_codewords(matrix, version, mask):
+    """Read the codeword stream in the symbol's zig-zag placement order"""
+    size = len(matrix)
+    reserved = _function_modules(version)
+    mask_func = _MASKS[mask]
+
+    bits = []
+    row, step = size - 1, -1
+    col = size - 1
+    while col > 0:
+        if col == 6:
+            col -= 1
+        while 0 <= row < size:
+            for c in (col, col - 1):
+                if not reserved[row, c]:
+                    bit = bool(matrix[row, c])
+                    if mask_func(row, c):
+                        bit = not bit
+                    bits.append(bit)
+            row += step
+        row -= step
+        step = -step
+        col -= 2
+
+    codewords = []
+    for i in range(0, len(bits) - 7, 8):
+        value = 0
+        for bit in bits[i:i + 8]:
+            value = (value << 1) | bit
+        codewords.append(value)
+    return codewords
+
+
+def _deinterleave(codewords, version, error_correction):
+    """Split interleaved codewords into blocks, correct them and join the data"""
+    blocks = rs_blocks(version, error_correction)
+    data = [[] for _ in blocks]
+    ecc = [[] for _ in blocks]
+
+    index = 0
+    for i in range(max(b.data_count for b in blocks)):
+        for n, block in enumerate(blocks):
+            if i < block.data_count:
+                data[n].append(codewords[index])
+                index += 1
+    for i in range(max(b.total_count - b.data_count for b in blocks)):
+        for n, block in enumerate(blocks):
+            if i < block.total_count - block.data_count:
+                ecc[n].append(codewords[index])
+                index += 1
+
+    result = []
+    for n, block in enumerate(blocks):
+        corrected = rs_correct(data[n] + ecc[n], block.total_count - block.data_count)
+        result.extend(corrected[:block.data_count])
+    return result
+
+
+def _parse_segments(data, version):
+    """Decode numeric, alphanumeric and byte segments into a string"""
+    bits = ''.join(f'{b:08b}' for b in data)
+    pos = 0
+    size_class = 0 if version < 10 else 1 if version < 27 else 2
+    count_bits = {
+        1: (10, 12, 14)[size_class],
+        2: (9, 11, 13)[size_class],
+        4: (8, 16, 16)[size_class],
+    }
+
+    def take(n):
+        nonlocal pos
+        if pos + n > len(bits):
+            raise QRDecodeError("Truncated data segment")
+        value = int(bits[pos:pos + n], 2) if n else 0
+        pos += n
+        return value
+
+    raw = bytearray()
+    while pos + 4 <= len(bits):
+        mode = take(4)
+        if mode == 0:
+            break
+        if mode == 7:
+            # ECI designator; payloads are always UTF-8 so it is skipped
+            if take(1):
+                take(15 if take(1) else 14)
+            else:
+                take(7)
+            continue
+        if mode not in count_bits:
+            raise QRDecodeError(f"Unsupported QR mode {mode}")
+
+        count = take(count_bits[mode])
+        if mode == 1:
+            digits = ''
+            while count >= 3:
+                digits += f'{take(10):03d}'
+                count -= 3
+            if count == 2:
+                digits += f'{take(7):02d}'
+            elif count == 1:
+                digits += str(take(4))
+            raw.extend(digits.encode('ascii'))
+        elif mode == 2:
+            chars = ''
+            while count >= 2:
+                value = take(11)
+                chars += _ALPHANUMERIC[value // 45] + _ALPHANUMERIC[value % 45]
+                count -= 2
+            if count:
+                chars += _ALPHANUMERIC[take(6)]
+            raw.extend(chars.encode('ascii'))
+        else:
+            raw.extend(take(8) for _ in range(count))
+
+    return raw.decode('utf-8', errors='replace')
+
+
+def decode_matrix(matrix):
+    """Decode a square boolean module matrix (True = dark) into its text"""
+    matrix = np.asarray(matrix, dtype=bool)
+    size = len(matrix)
+    version = (size - 17) // 4
+    if version < 1 or version > 40 or version * 4 + 17 != size:
+        raise QRDecodeError(f"Invalid symbol size {size}")
+
+    error_correction, mask = _read_format(matrix)
+    codewords = _read_codewords(matrix, version, mask)
+    data = _deinterleave(codewords, version, error_correction)
+    return _parse_segments(data, version)
+
+
+# --- Locating the symbol in an image ---
+
+def _binarize(image):
+    """Grayscale image to a dark-module mask using Otsu's threshold"""
+    gray = np.asarray(image.convert('L'), dtype=np.uint8)
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = gray.size
+    cumulative = np.cumsum(hist)
+    cumulative_mean = np.cumsum(hist * np.arange(256))
+    background = cumulative[:-1]
+    foreground = total - background
+    valid = (background > 0) & (foreground > 0)
+    if not valid.any():
+        raise QRDecodeError("Blank image")
+
+    mean_bg = np.where(valid, cumulative_mean[:-1] / np.maximum(background, 1), 0)
+    mean_fg = np.where(valid, (cumulative_mean[-1] - cumulative_mean[:-1]) / np.maximum(foreground, 1), 0)
+    between = np.where(valid, background * foreground * (mean_bg - mean_fg) ** 2, 0)
+    return gray <= int(np.argmax(between))
+
+
+def _runs(line):
+    """Run starts, lengths and colors of a 1-D boolean array"""
+    change = np.flatnonzero(line[1:] != line[:-1]) + 1
+    starts = np.concatenate(([0], change))
+    lengths = np.diff(np.concatenate((starts, [len(line)])))
+    return starts, lengths, line[starts]
+
+
+def _finder_windows(starts, lengths, colors):
+    """Indices of run windows matching the 1:1:3:1:1 finder ratio"""
+    if len(lengths) < 5:
+        return np.array([], dtype=int), None
+    window = np.lib.stride_tricks.sliding_window_view(lengths, 5).astype(np.float64)
+    unit = window.sum(axis=1) / 7.0
+    tolerance = unit * 0.5
+    ok = (
+        colors[:len(window)]
+        & (np.abs(window[:, 0] - unit) < tolerance)
+        & (np.abs(window[:, 1] - unit) < tolerance)
+        & (np.abs(window[:, 2] - 3 * unit) < 3 * tolerance)
+        & (np.abs(window[:, 3] - unit) < tolerance)
+        & (np.abs(window[:, 4] - unit) < tolerance)
+        & (unit >= 1)
+    )
+    return np.flatnonzero(ok), unit
+
+
+def _cross_check(line, position):
+    """Center and module size of a finder pattern crossing ``line`` at ``position``"""
+    starts, lengths, colors = _runs(line)
+    k = int(np.searchsorted(starts, position, side='right')) - 1
+    if k < 2 or k + 2 >= len(lengths) or not colors[k]:
+        return None
+    matches, unit = _finder_windows(starts[k - 2:k + 3], lengths[k - 2:k + 3], colors[k - 2:k + 3])
+    if not len(matches):
+        return None
+    end = starts[k + 2] + lengths[k + 2]
+    return (starts[k - 2] + end) / 2.0, unit[0]
+
+
+def _find_finder_patterns(dark):
+    """Cluster candidate finder centers as ``[(x, y, module_size, hits)]``"""
+    height, width = dark.shape
+
+    # Run-length encode every row at once; a new run also starts each row
+    flat = dark.ravel()
+    change = np.empty(flat.size, dtype=bool)
+    change[0] = True
+    change[1:] = flat[1:] != flat[:-1]
+    change[::width] = True
+    starts = np.flatnonzero(change)
+    lengths = np.diff(np.append(starts, flat.size))
+    matches, unit = _finder_windows(starts, lengths, flat[starts])
+    if len(matches):
+        # Drop windows that straddle two rows
+        same_row = starts[matches] // width == starts[matches + 4] // width
+        matches = matches[same_row]
+
+    candidates = []
+    for i in matches:
+        y, x0 = divmod(int(starts[i]), width)
+        x = x0 + unit[i] * 3.5
+        vertical = _cross_check(dark[:, int(x)], y)
+        if vertical is None:
+            continue
+        cy, vunit = vertical
+        horizontal = _cross_check(dark[int(cy)], int(x))
+        if horizontal is None:
+            continue
+        cx, hunit = horizontal
+        candidates.append((cx, cy, (unit[i] + vunit + hunit) / 3.0))
+
+    clusters = []
+    for cx, cy, size in candidates:
+        for cluster in clusters:
+            if abs(cluster[0] - cx) < cluster[2] * 2 and abs(cluster[1] - cy) < cluster[2] * 2:
+                hits = cluster[3]
+                cluster[0] = (cluster[0] * hits + cx) / (hits + 1)
+                cluster[1] = (cluster[1] * hits + cy) / (hits + 1)
+                cluster[2] = (cluster[2] * hits + size) / (hits + 1)
+                cluster[3] = hits + 1
+                break
+        else:
+            clusters.append([cx, cy, size, 1])
+
+    clusters.sort(key=lambda c: -c[3])
+    return clusters[:8]
+
+
+def _orient(patterns):
+    """Pick three finders forming the symbol; returns top-left, top-right, bottom-left"""
+    best, best_score = None, None
+    for trio in combinations(patterns, 3):
+        points = [np.array(p[:2]) for p in trio]
+        sizes = [p[2] for p in trio]
+        if max(sizes) > min(sizes) * 1.5:
+            continue
+        for corner in range(3):
+            a = points[corner]
+            b, c = [points[i] for i in range(3) if i != corner]
+            ab, ac = b - a, c - a
+            la, lc = np.linalg.norm(ab), np.linalg.norm(ac)
+            if la == 0 or lc == 0:
+                continue
+            cosine = abs(float(np.dot(ab, ac))) / (la * lc)
+            skew = abs(la - lc) / max(la, lc)
+            if cosine > 0.2 or skew > 0.2:
+                continue
+            score = cosine + skew
+            if best_score is None or score < best_score:
+                # y grows downwards, so top-right is clockwise from bottom-left
+                if ab[0] * ac[1] - ab[1] * ac[0] < 0:
+                    b, c = c, b
+                best_score = score
+                best = (a, b, c, float(np.mean(sizes)))
+    if best is None:
+        raise QRDecodeError("No QR code found")
+    return best
+
+
+def _sample(dark, top_left, top_right, bottom_left, size):
+    """Sample module centers on the affine grid spanned by the finders"""
+    u = (top_right - top_left) / (size - 7)
+    v = (bottom_left - top_left) / (size - 7)
+    origin = top_left - 3 * u - 3 * v
+    index = np.arange(size)
+    cols, rows = np.meshgrid(index, index)
+    xs = origin[0] + cols * u[0] + rows * v[0]
+    ys = origin[1] + cols * u[1] + rows * v[1]
+    height, width = dark.shape
+    xs = np.clip(np.rint(xs).astype(int), 0, width - 1)
+    ys = np.clip(np.rint(ys).astype(int), 0, height - 1)
+    return dark[ys, xs]
+
+
+def _decode_builtin(image):
+    dark = _binarize(image)
+    patterns = _find_finder_patterns(dark)
+    if len(patterns) < 3:
+        raise QRDecodeError("No QR code found")
+
+    top_left, top_right, bottom_left, module = _orient(patterns)
+    span = (np.linalg.norm(top_right - top_left) + np.linalg.norm(bottom_left - top_left)) / 2
+    estimate = int(round((span / module + 7 - 17) / 4))
+
+    last_error = None
+    for version in (estimate, estimate + 1, estimate - 1):
+        if not 1 <= version <= 40:
+            continue
+        size = version * 4 + 17
+        try:
+            return decode_matrix(_sample(dark, top_left, top_right, bottom_left, size))
+        except QRDecodeError as e:
+            last_error = e
+    raise last_error or QRDecodeError("No QR code found")
+
+
+def _decode_opencv(image):
+    import cv2
+
+    array = np.asarray(image.convert('RGB'))[:, :, ::-1]
+    text, _, _ = cv2.QRCodeDetector().detectAndDecode(array)
+    if not text:
+        raise QRDecodeError("OpenCV found no QR code")
+    return text
+
+
+def _decode_pyzbar(image):
+    from pyzbar import pyzbar
+
+    results = pyzbar.decode(image.convert('L'))
+    if not results:
+        raise QRDecodeError("pyzbar found no QR code")
+    return results[0].data.decode('utf-8', errors='replace')
+
+
+def decode_image(image):
+    """Return the text of the QR code in a PIL image, file path or file object"""
+    if not isinstance(image, Image.Image):
+        image = Image.open(image)
+
+    errors = []
+    for backend in (_decode_builtin, _decode_opencv, _decode_pyzbar):
+        try:
+            return backend(image)
+        except ImportError:
+            continue
+        except Exception as e:
+            errors.append(str(e))
+    raise QRDecodeError(errors[0] if errors else "No QR code found")
+
+
+def extract_unique_id(payload):
+    """Pull the employee's Unique ID out of a card's QR payload"""
+    try:
+        return qr_payload.parse_payload(payload)
+    except qr_payload.InvalidPayload as e:
+        raise QRDecodeError(str(e))
+
+
+def _decode_item(item):
+    """Worker entry point: ``(name, data)`` -> ``(name, unique_id, error)``"""
+    name, data = item
+    try:
+        payload = decode_image(io.BytesIO(data))
+        return name, extract_unique_id(payload), None
+    except Exception as e:
+        return name, None, str(e)
+
+
+def decode_many(items, workers=None, chunk_size=16, mp_context=None):
+    """Decode ``(name, image_bytes)`` pairs, in parallel for larger batches.
+
+    ``mp_context`` is passed to the process pool; multithreaded callers
+    such as the Streamlit server should pass a spawn context, since forking
+    a process with running threads can deadlock the children.
+
+    Returns ``(name, unique_id, error)`` tuples in input order.
+    """
+    items = list(items)
+    if workers == 1 or len(items) < PARALLEL_THRESHOLD:
+        return [_decode_item(item) for item in items]
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+        return list(pool.map(_decode_item, items, chunksize=chunk_size))
+
+
+def iter_images(source):
+    """Yield ``(name, bytes)`` for images in a folder, a ZIP file or a single file"""
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                with open(os.path.join(source, name), 'rb') as f:
+                    yield name, f.read()
+    elif zipfile.is_zipfile(source):
+        yield from iter_zip_images(source)
+    else:
+        with open(source, 'rb') as f:
+            yield os.path.basename(source), f.read()
+
+
+def iter_zip_images(zip_file):
+    """Yield ``(name, bytes)`` for every image inside a ZIP archive"""
+    with zipfile.ZipFile(zip_file) as archive:
+        for name in archive.namelist():
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield name, archive.read(name)
+
+
+def decode_folder(source, workers=None):
+    """Decode every image under ``source`` and report throughput.
+
+    Returns ``(results, elapsed_seconds)``.
+    """
+    items = list(iter_images(source))
+    started = time.perf_counter()
+    results = decode_many(items, workers=workers)
+    return results, time.perf_counter() - started
@@ -0,0 +1,98 @@
+"""Compact, signed QR payloads for employee cards.
+
+A payload is ``AT1:<Unique ID>:<signature>``: a format tag, the employee's
+ID and a truncated HMAC-SHA256 in base32. Everything stays within the QR
+alphanumeric character set, so it fits a small fixed-version symbol.
+Cards printed before this format carry verbose ``key: value`` lines and
+are still accepted.
+"""
+import base64
+import hashlib
+import hmac
+import os
+
+
+PAYLOAD_PREFIX = 'AT1'
+SIGNATURE_LENGTH = 10  # base32 characters, 50 bits
+
+SECRET_ENV_VAR = 'EMPLOYEE_QR_SECRET'
+SECRET_PATH = 'data/qr_secret.key'
+
+_secret = None
+
+
+class InvalidPayload(ValueError):
+    """Raised when a QR payload is malformed or its signature does not match"""
+
+
+def _create_secret_file():
+    """Create the key file atomically so no process can read it half-written"""
+    directory = os.path.dirname(SECRET_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{SECRET_PATH}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(os.urandom(32).hex())
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        # Unlike a rename, link fails if another process created the key first
+        os.link(tmp_path, SECRET_PATH)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp_path)
+
+
+def _load_secret():
+    """Signing key from the environment, or a key file created on first use"""
+    global _secret
+    if _secret is not None:
+        return _secret
+
+    value = os.environ.get(SECRET_ENV_VAR)
+    if not value:
+        if not os.path.exists(SECRET_PATH):
+            _create_secret_file()
+        with open(SECRET_PATH) as f:
+            value = f.read().strip()
+        if not value:
+            raise RuntimeError(f"QR signing key {SECRET_PATH} is empty; delete it or set {SECRET_ENV_VAR}")
+
+    _secret = value.encode('utf-8')
+    return _secret
+
+
+def _signature(unique_id):
+    digest = hmac.new(
+        _load_secret(),
+        f"{PAYLOAD_PREFIX}:{unique_id}".encode('utf-8'),
+        hashlib.sha256
+    ).digest()
+    return base64.b32encode(digest).decode('ascii')[:SIGNATURE_LENGTH]
+
+
+def encode_payload(unique_id):
+    """Compact signed payload for an employee's Unique ID"""
+    unique_id = str(unique_id)
+    return f"{PAYLOAD_PREFIX}:{unique_id}:{_signature(unique_id)}"
+
+
+def parse_payload(payload, allow_legacy=True):
+    """Return the Unique ID from a compact or legacy verbose payload"""
+    payload = payload.strip()
+    if payload.startswith(f"{PAYLOAD_PREFIX}:"):
+        _, unique_id, signature = (payload.split(':', 2) + ['', ''])[:3]
+        if not unique_id or not hmac.compare_digest(signature, _signature(unique_id)):
+            raise InvalidPayload("QR code signature does not match")
+        return unique_id
+
+    if allow_legacy:
+        # Verbose "key: value" lines written by earlier versions of the app
+        for line in payload.splitlines():
+            key, sep, value = line.partition(':')
+            if sep and key.strip() == 'Unique ID':
+                return value.strip()
+
+    raise InvalidPayload("QR code does not contain a Unique ID")
@@ -0,0 +1,293 @@
+"""Background card rendering with a persistent job table.
+
+Jobs are rows in a SQLite table, so queued work survives a restart. A
+fixed number of worker threads (the concurrency limit) claim queued jobs,
+render the card, and put the PNG in the RenderedCardCache under its
+content address. Failed renders are retried with exponential backoff up to
+``max_attempts``. The UI submits a job, polls ``status`` and reads the
+finished PNG with ``result``.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import card_renderer
+from card_cache import card_key
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class RenderQueue:
+    """Render cards on ``workers`` background threads.
+
+    There is at most one job per card: submitting the same card again
+    returns its existing job, which is queued again only if its PNG has
+    left the cache; failed jobs wait for ``retry_failed``. Finished jobs older than ``keep_seconds`` are
+    purged when the queue starts.
+    """
+
+    def __init__(self, card_cache, db_path='data/render_jobs.db', workers=2,
+                 max_attempts=3, retry_delay=1.0, keep_seconds=7 * 24 * 3600):
+        self.card_cache = card_cache
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._closed = False
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+        self.purge(keep_seconds)
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"card-render-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _create_schema(self):
+        """Create the job table and requeue jobs a previous process left running"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS render_jobs ("
+                " id TEXT PRIMARY KEY,"
+                " unique_id TEXT NOT NULL,"
+                " employee TEXT NOT NULL,"
+                " logo_path TEXT,"
+                " photo_path TEXT,"
+                " card_key TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " not_before REAL NOT NULL DEFAULT 0,"
+                " error TEXT,"
+                " created REAL NOT NULL,"
+                " updated REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_render_jobs_status"
+                " ON render_jobs(status, not_before)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_render_jobs_key ON render_jobs(card_key)"
+            )
+            self._conn.execute(
+                "UPDATE render_jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING)
+            )
+
+    def submit(self, employee_data, logo_path=None, photo_path=None):
+        """Queue a card render; returns the job id"""
+        return self.submit_many([(employee_data, logo_path, photo_path)])[0]
+
+    def submit_many(self, cards):
+        """Queue (employee_data, logo_path, photo_path) renders in one transaction"""
+        now = time.time()
+        rows = []
+        for employee_data, logo_path, photo_path in cards:
+            employee = {str(k): v for k, v in dict(employee_data).items()}
+            if not (isinstance(photo_path, str) and os.path.exists(photo_path)):
+                photo_path = None
+            key = card_key(employee, logo_path, photo_path)
+            rows.append((
+                str(employee['Unique ID']), json.dumps(employee, default=str),
+                logo_path if isinstance(logo_path, str) else None, photo_path, key,
+                key in self.card_cache,
+            ))
+
+        job_ids = []
+        queued = False
+        with self._lock, self._conn:
+            for unique_id, employee, logo_path, photo_path, key, cached in rows:
+                existing = self._conn.execute(
+                    "SELECT id, status FROM render_jobs WHERE card_key = ?"
+                    " ORDER BY updated DESC LIMIT 1", (key,)
+                ).fetchone()
+                # Cards already in the cache need no work
+                status = DONE if cached else QUEUED
+                if existing is None:
+                    job_id = uuid.uuid4().hex
+                    self._conn.execute(
+                        "INSERT INTO render_jobs (id, unique_id, employee, logo_path, photo_path,"
+                        " card_key, status, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (job_id, unique_id, employee, logo_path, photo_path, key, status, now, now)
+                    )
+                else:
+                    job_id, current = existing
+                    # Failed jobs stay failed until retry_failed; done jobs
+                    # are rendered again once their PNG has left the cache
+                    if current == DONE and not cached:
+                        self._conn.execute(
+                            "UPDATE render_jobs SET status = ?, attempts = 0, not_before = 0,"
+                            " error = NULL, updated = ? WHERE id = ?", (status, now, job_id)
+                        )
+                queued = queued or status == QUEUED
+                job_ids.append(job_id)
+            if queued:
+                self._wakeup.notify_all()
+        return job_ids
+
+    def _claim(self):
+        """Mark the oldest runnable job as running and return it; callers hold the lock"""
+        row = self._conn.execute(
+            "SELECT id, employee, logo_path, photo_path FROM render_jobs"
+            " WHERE status = ? AND not_before <= ? ORDER BY created LIMIT 1",
+            (QUEUED, time.time())
+        ).fetchone()
+        if row is not None:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE render_jobs SET status = ?, attempts = attempts + 1, updated = ?"
+                    " WHERE id = ?", (RUNNING, time.time(), row[0])
+                )
+        return row
+
+    def _next_retry(self):
+        """Seconds until the next backed-off job is due, or None; callers hold the lock"""
+        row = self._conn.execute(
+            "SELECT MIN(not_before) FROM render_jobs WHERE status = ?", (QUEUED,)
+        ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def _work(self):
+        while True:
+            with self._wakeup:
+                job = None
+                while not self._closed:
+                    job = self._claim()
+                    if job is not None:
+                        break
+                    self._wakeup.wait(self._next_retry())
+                if self._closed:
+                    return
+            self._run(*job)
+
+    def _run(self, job_id, employee, logo_path, photo_path):
+        employee = json.loads(employee)
+        try:
+            card = card_renderer.create_employee_card(employee, logo_path, photo_path)
+            data = card_renderer.encode_png(card)
+            # Keyed by the inputs as rendered, in case the logo changed since submit
+            key = card_key(employee, logo_path, photo_path)
+            self.card_cache.put(key, data)
+        except Exception as e:
+            logger.warning("Rendering card for %s failed: %s", employee.get('Unique ID'), e)
+            self._failed(job_id, f"{type(e).__name__}: {e}")
+            return
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE render_jobs SET status = ?, card_key = ?, error = NULL, updated = ?"
+                " WHERE id = ?", (DONE, key, time.time(), job_id)
+            )
+
+    def _failed(self, job_id, error):
+        """Requeue with backoff, or give up after ``max_attempts``"""
+        with self._lock, self._conn:
+            attempts = self._conn.execute(
+                "SELECT attempts FROM render_jobs WHERE id = ?", (job_id,)
+            ).fetchone()[0]
+            now = time.time()
+            if attempts < self.max_attempts:
+                self._conn.execute(
+                    "UPDATE render_jobs SET status = ?, not_before = ?, error = ?, updated = ?"
+                    " WHERE id = ?",
+                    (QUEUED, now + self.retry_delay * 2 ** (attempts - 1), error, now, job_id)
+                )
+                self._wakeup.notify_all()
+            else:
+                self._conn.execute(
+                    "UPDATE render_jobs SET status = ?, error = ?, updated = ? WHERE id = ?",
+                    (FAILED, error, now, job_id)
+                )
+
+    def status(self, job_id):
+        """Job details as a dict, or None for an unknown id"""
+        return self.statuses([job_id]).get(job_id)
+
+    def statuses(self, job_ids):
+        """Dict of job id -> details for the given jobs"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, unique_id, status, attempts, error, card_key FROM render_jobs"
+                f" WHERE id IN ({', '.join('?' * len(job_ids))})", job_ids
+            ).fetchall()
+        return {
+            row[0]: {
+                'unique_id': row[1], 'status': row[2], 'attempts': row[3],
+                'error': row[4], 'card_key': row[5],
+            }
+            for row in rows
+        }
+
+    def result(self, job_id):
+        """PNG bytes of a finished job, or None while it is pending or failed.
+
+        A finished card that has since been evicted from the cache is
+        queued again.
+        """
+        job = self.status(job_id)
+        if job is None or job['status'] != DONE:
+            return None
+        data = self.card_cache.get(job['card_key'])
+        if data is None:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "UPDATE render_jobs SET status = ?, attempts = 0, not_before = 0, updated = ?"
+                    " WHERE id = ?", (QUEUED, time.time(), job_id)
+                )
+                self._wakeup.notify_all()
+        return data
+
+    def retry_failed(self):
+        """Queue every failed job again; returns how many"""
+        with self._lock, self._conn:
+            count = self._conn.execute(
+                "UPDATE render_jobs SET status = ?, attempts = 0, not_before = 0, updated = ?"
+                " WHERE status = ?", (QUEUED, time.time(), FAILED)
+            ).rowcount
+            self._wakeup.notify_all()
+        return count
+
+    def purge(self, older_than=7 * 24 * 3600):
+        """Delete finished and failed jobs last updated more than ``older_than`` seconds ago"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM render_jobs WHERE status IN (?, ?) AND updated < ?",
+                (DONE, FAILED, time.time() - older_than)
+            ).rowcount
+
+    def stats(self):
+        """Number of jobs in each state"""
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM render_jobs GROUP BY status"
+            ).fetchall())
+        return {status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)}
+
+    def close(self):
+        """Stop the workers after their current job and close the job table"""
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify_all()
+        for worker in self._workers:
+            worker.join()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,218 @@
+"""Print-ready sheets of employee cards.
+
+Cards are imposed at CR80 size onto A4 or Letter pages and written out one
+page at a time, so memory use is one page plus one card however many
+employees are exported.
+"""
+import io
+import os
+
+from PIL import Image, ImageDraw, TiffImagePlugin
+
+import card_renderer
+
+
+MM_PER_INCH = 25.4
+
+PAPER_SIZES_MM = {
+    'a4': (210.0, 297.0),
+    'letter': (215.9, 279.4),
+}
+
+# ISO/IEC 7810 ID-1 (CR80) card
+CR80_MM = (85.60, 53.98)
+
+MARGIN_MM = 5.0
+GAP_MM = 3.0
+
+
+def mm_to_px(mm, dpi):
+    return int(round(mm / MM_PER_INCH * dpi))
+
+
+class SheetLayout:
+    """Grid of CR80 card slots on a page"""
+
+    def __init__(self, paper='a4', dpi=300):
+        if paper not in PAPER_SIZES_MM:
+            raise ValueError(f"Unknown paper size {paper!r}")
+        self.dpi = dpi
+        self.page_size = tuple(mm_to_px(mm, dpi) for mm in PAPER_SIZES_MM[paper])
+        self.cell_size = tuple(mm_to_px(mm, dpi) for mm in CR80_MM)
+
+        margin = mm_to_px(MARGIN_MM, dpi)
+        gap = mm_to_px(GAP_MM, dpi)
+        page_w, page_h = self.page_size
+        cell_w, cell_h = self.cell_size
+        self.columns = max(1, (page_w - 2 * margin + gap) // (cell_w + gap))
+        self.rows = max(1, (page_h - 2 * margin + gap) // (cell_h + gap))
+
+        # Center the grid on the page
+        grid_w = self.columns * cell_w + (self.columns - 1) * gap
+        grid_h = self.rows * cell_h + (self.rows - 1) * gap
+        left = (page_w - grid_w) // 2
+        top = (page_h - grid_h) // 2
+        self.slots = [
+            (left + c * (cell_w + gap), top + r * (cell_h + gap))
+            for r in range(self.rows)
+            for c in range(self.columns)
+        ]
+
+    @property
+    def cards_per_page(self):
+        return len(self.slots)
+
+    def new_page(self):
+        return Image.new('RGB', self.page_size, 'white')
+
+    def place(self, page, card, slot):
+        """Scale a card into a slot without distorting it and add cut marks"""
+        cell_w, cell_h = self.cell_size
+        scale = min(cell_w / card.width, cell_h / card.height)
+        size = (int(card.width * scale), int(card.height * scale))
+        card = card.resize(size, Image.LANCZOS)
+
+        x, y = self.slots[slot]
+        page.paste(card, (x + (cell_w - size[0]) // 2, y + (cell_h - size[1]) // 2))
+        ImageDraw.Draw(page).rectangle(
+            [x - 1, y - 1, x + cell_w, y + cell_h], outline=(200, 200, 200)
+        )
+
+
+class PdfSheetWriter:
+    """Minimal PDF writer that streams one JPEG-compressed page at a time"""
+
+    def __init__(self, path, dpi=300, quality=95):
+        self.dpi = dpi
+        self.quality = quality
+        self._file = open(path, 'wb')
+        self._offsets = {}
+        self._pages = []
+        # Objects 1 and 2 are the catalog and page tree, written on close
+        self._next_id = 3
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write_object(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(f"{obj_id} 0 obj\n".encode('ascii'))
+        self._file.write(body)
+        if stream is not None:
+            self._file.write(b"\nstream\n")
+            self._file.write(stream)
+            self._file.write(b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def _allocate(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def add_page(self, page):
+        buf = io.BytesIO()
+        page.save(buf, format='JPEG', quality=self.quality, dpi=(self.dpi, self.dpi))
+        jpeg = buf.getvalue()
+
+        width_pt = page.width / self.dpi * 72
+        height_pt = page.height / self.dpi * 72
+        image_id, content_id, page_id = self._allocate(), self._allocate(), self._allocate()
+
+        self._write_object(image_id, (
+            f"<< /Type /XObject /Subtype /Image /Width {page.width} /Height {page.height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode "
+            f"/Length {len(jpeg)} >>"
+        ).encode('ascii'), jpeg)
+
+        content = f"q {width_pt:.2f} 0 0 {height_pt:.2f} 0 0 cm /Im0 Do Q".encode('ascii')
+        self._write_object(content_id, f"<< /Length {len(content)} >>".encode('ascii'), content)
+
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width_pt:.2f} {height_pt:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>"
+        ).encode('ascii'))
+        self._pages.append(page_id)
+
+    def close(self):
+        kids = ' '.join(f"{page_id} 0 R" for page_id in self._pages)
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._write_object(2, (
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>"
+        ).encode('ascii'))
+
+        xref_offset = self._file.tell()
+        size = self._next_id
+        self._file.write(f"xref\n0 {size}\n".encode('ascii'))
+        self._file.write(b"0000000000 65535 f \n")
+        for obj_id in range(1, size):
+            self._file.write(f"{self._offsets[obj_id]:010d} 00000 n \n".encode('ascii'))
+        self._file.write((
+            f"trailer\n<< /Size {size} /Root 1 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n"
+        ).encode('ascii'))
+        self._file.close()
+
+
+class TiffSheetWriter:
+    """Multi-page TIFF written one frame at a time"""
+
+    def __init__(self, path, dpi=300):
+        self.dpi = dpi
+        self._writer = TiffImagePlugin.AppendingTiffWriter(path, True)
+        self._writer.__enter__()
+
+    def add_page(self, page):
+        page.save(self._writer, format='TIFF', compression='tiff_deflate',
+                  dpi=(self.dpi, self.dpi))
+        self._writer.newFrame()
+
+    def close(self):
+        self._writer.__exit__(None, None, None)
+
+
+def _writer_for(path, dpi):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        return PdfSheetWriter(path, dpi=dpi)
+    if extension in ('.tif', '.tiff'):
+        return TiffSheetWriter(path, dpi=dpi)
+    raise ValueError("Output must be a .pdf or .tiff file")
+
+
+def export_sheets(employees, output_path, logo_path=None, paper='a4', dpi=300,
+                  progress=None, on_error=None):
+    """Impose cards for ``employees`` (an iterable of dicts) onto printable pages.
+
+    Pages are written as soon as they are full. Returns ``(cards, pages)``.
+    ``progress`` is called with the number of cards placed after each page.
+    """
+    layout = SheetLayout(paper, dpi)
+    writer = _writer_for(output_path, dpi)
+    cards = pages = 0
+    page = None
+    try:
+        for employee in employees:
+            if page is None:
+                page = layout.new_page()
+
+            photo = employee.get('Photo')
+            if not (isinstance(photo, str) and os.path.exists(photo)):
+                photo = None
+            card = card_renderer.create_employee_card(employee, logo_path, photo, on_error=on_error)
+            layout.place(page, card, cards % layout.cards_per_page)
+            cards += 1
+
+            if cards % layout.cards_per_page == 0:
+                writer.add_page(page)
+                pages += 1
+                page = None
+                if progress:
+                    progress(cards)
+
+        if page is not None:
+            writer.add_page(page)
+            pages += 1
+            if progress:
+                progress(cards)
+    finally:
+        writer.close()
+    return cards, pages
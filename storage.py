@@ -0,0 +1,619 @@
+import os
+import pickle
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from attendance_ingest import SHIFT_STARTS, shift_day
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+
+ATTENDANCE_COLUMNS = ['Unique ID', 'Name', 'Date', 'Time', 'Timestamp']
+EMPLOYEE_COLUMNS = ['Unique ID', 'Name', 'CNIC', 'Age', 'Role', 'City', 'Shift', 'Photo']
+
+# Accepted values for new employees, from the sidebar form or a roster import
+ROLES = [
+    "Software Engineer", "Data Analyst", "Project Manager",
+    "HR Specialist", "Sales Executive", "Marketing Coordinator"
+]
+SHIFTS = list(SHIFT_STARTS)
+MIN_AGE, MAX_AGE = 18, 65
+
+ID_PREFIX = 'AT'
+_ID_PATTERN = re.compile(rf'^{ID_PREFIX}-(\d+)$')
+
+
+class DuplicateEmployee(ValueError):
+    """Raised when an employee's Unique ID or CNIC is already registered"""
+
+
+def normalize_cnic(cnic):
+    """CNIC digits only, so 35202-1234567-1 and 3520212345671 match"""
+    return re.sub(r'\D', '', str(cnic))
+
+
+class EmployeeRepository:
+    """Employee records with hash indexes on Unique ID and CNIC.
+
+    Lookups and inserts are O(1); the DataFrame view used by the UI and the
+    pickle on disk is rebuilt lazily after changes. Unique IDs come from a
+    monotonic sequence that is stored with the DataFrame, so deleting
+    employees never causes an ID to be handed out twice.
+    """
+
+    def __init__(self, employees=None):
+        self._records = []
+        self._by_id = {}
+        self._by_cnic = {}
+        self._next_sequence = 1
+        self._frame = None
+
+        if employees is not None:
+            for record in employees.to_dict('records'):
+                self._index(record)
+            self._next_sequence = max(
+                self._next_sequence,
+                int(employees.attrs.get('next_sequence', 1))
+            )
+
+    def _index(self, record):
+        position = len(self._records)
+        self._records.append(record)
+        self._by_id[str(record['Unique ID'])] = position
+        cnic = normalize_cnic(record.get('CNIC', ''))
+        if cnic:
+            self._by_cnic.setdefault(cnic, position)
+
+        match = _ID_PATTERN.match(str(record['Unique ID']))
+        if match:
+            self._next_sequence = max(self._next_sequence, int(match.group(1)) + 1)
+        self._frame = None
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, unique_id):
+        return str(unique_id) in self._by_id
+
+    def get(self, unique_id):
+        """Employee record for a Unique ID, or None"""
+        position = self._by_id.get(str(unique_id))
+        return dict(self._records[position]) if position is not None else None
+
+    def get_by_cnic(self, cnic):
+        """Employee record for a CNIC, or None"""
+        position = self._by_cnic.get(normalize_cnic(cnic))
+        return dict(self._records[position]) if position is not None else None
+
+    def allocate_id(self):
+        """Reserve the next Unique ID (e.g. AT-001, AT-002)"""
+        while True:
+            unique_id = f'{ID_PREFIX}-{self._next_sequence:03d}'
+            self._next_sequence += 1
+            if unique_id not in self._by_id:
+                return unique_id
+
+    def allocate_ids(self, count):
+        """Reserve ``count`` Unique IDs in one pass over the sequence"""
+        return [self.allocate_id() for _ in range(count)]
+
+    def add(self, employee_data):
+        """Insert a new employee, rejecting duplicate IDs and CNICs"""
+        record = {column: employee_data.get(column) for column in EMPLOYEE_COLUMNS}
+        if str(record['Unique ID']) in self._by_id:
+            raise DuplicateEmployee(f"Unique ID {record['Unique ID']} is already in use")
+        if normalize_cnic(record['CNIC']) in self._by_cnic:
+            raise DuplicateEmployee(f"CNIC {record['CNIC']} is already registered")
+        self._index(record)
+        return dict(record)
+
+    def add_many(self, records):
+        """Insert several new employees; records without a Unique ID get one.
+
+        Raises DuplicateEmployee on the first clash, with earlier records
+        already inserted, so callers that need all-or-nothing must discard
+        the repository on failure (as EmployeeStore does).
+        """
+        records = [dict(record) for record in records]
+        missing = [record for record in records if not record.get('Unique ID')]
+        for record, unique_id in zip(missing, self.allocate_ids(len(missing))):
+            record['Unique ID'] = unique_id
+        return [self.add(record) for record in records]
+
+    def update(self, unique_id, changes):
+        """Change fields of an existing employee; the Unique ID is fixed"""
+        position = self._by_id.get(str(unique_id))
+        if position is None:
+            raise KeyError(unique_id)
+        record = self._records[position]
+        changes = {k: v for k, v in changes.items() if k in EMPLOYEE_COLUMNS and k != 'Unique ID'}
+
+        if 'CNIC' in changes:
+            new_cnic = normalize_cnic(changes['CNIC'])
+            owner = self._by_cnic.get(new_cnic)
+            if owner is not None and owner != position:
+                raise DuplicateEmployee(f"CNIC {changes['CNIC']} is already registered")
+            old_cnic = normalize_cnic(record.get('CNIC', ''))
+            if self._by_cnic.get(old_cnic) == position:
+                del self._by_cnic[old_cnic]
+            if new_cnic:
+                self._by_cnic[new_cnic] = position
+
+        record.update(changes)
+        self._frame = None
+        return dict(record)
+
+    def to_dataframe(self):
+        """DataFrame view in the legacy employees.pkl layout"""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self._records, columns=EMPLOYEE_COLUMNS)
+        # Persist the sequence so IDs stay monotonic across restarts
+        self._frame.attrs['next_sequence'] = self._next_sequence
+        return self._frame
+
+
+class EmployeeStore:
+    """Process-wide employee data shared by every session.
+
+    Wraps one EmployeeRepository with the same read methods. Writes go
+    through ``add``/``update``, which hold an exclusive lock on
+    ``<path>.lock`` (so the CLI and API processes can't interleave), merge
+    in changes saved by other processes and persist the pickle atomically.
+    New employees get their Unique IDs inside that lock, so concurrent
+    writers never hand out the same ID.
+    """
+
+    def __init__(self, path='data/employees.pkl'):
+        self.path = path
+        self._lock = threading.RLock()
+        self._repo = EmployeeRepository()
+        self._mtime = None
+        self.refresh()
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Reload the pickle if another process has replaced it"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if mtime != self._mtime:
+                with open(self.path, 'rb') as f:
+                    employees = pickle.load(f)
+                self._repo = EmployeeRepository(employees)
+                self._mtime = mtime
+
+    def _save(self):
+        frame = self._repo.to_dataframe()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(frame, f)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def _write(self, change):
+        with self._lock, self._file_lock():
+            self.refresh()
+            try:
+                result = change(self._repo)
+                self._save()
+            except Exception:
+                # Drop the partial change by reloading what is on disk, or
+                # starting empty if nothing has been saved yet
+                self._repo = EmployeeRepository()
+                self._mtime = None
+                self.refresh()
+                raise
+            return result
+
+    def add(self, employee_data):
+        """Insert and persist a new employee.
+
+        A record without a Unique ID gets the next one under the write
+        lock; the stored record is returned.
+        """
+        return self._write(lambda repo: repo.add_many([employee_data])[0])
+
+    def add_many(self, records):
+        """Insert and persist several new employees with a single save.
+
+        Unique IDs are allocated under the write lock for records without
+        one. Nothing is saved if any record clashes with an existing one.
+        """
+        records = list(records)
+        return self._write(lambda repo: repo.add_many(records))
+
+    def update(self, unique_id, changes):
+        """Change and persist fields of an existing employee"""
+        return self._write(lambda repo: repo.update(unique_id, changes))
+
+    def update_many(self, updates):
+        """Apply several (unique_id, changes) pairs with a single save"""
+        updates = list(updates)
+        return self._write(
+            lambda repo: [repo.update(unique_id, changes) for unique_id, changes in updates]
+        )
+
+    def get(self, unique_id):
+        with self._lock:
+            return self._repo.get(unique_id)
+
+    def get_by_cnic(self, cnic):
+        with self._lock:
+            return self._repo.get_by_cnic(cnic)
+
+    def to_dataframe(self):
+        with self._lock:
+            return self._repo.to_dataframe()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._repo)
+
+    def __contains__(self, unique_id):
+        with self._lock:
+            return unique_id in self._repo
+
+
+class AttendanceStore:
+    """Append-only attendance log backed by SQLite in WAL mode.
+
+    Each punch is a single-row INSERT, so recording attendance costs the
+    same regardless of how much history has been stored. ``shift_of`` maps
+    a Unique ID to the employee's Shift; punches are rolled up by the day
+    their shift starts, so a Night shift that ends after midnight is one
+    day. Without it (or for unknown shifts) the calendar day is used.
+    """
+
+    def __init__(self, db_path='data/attendance.db', shift_of=None):
+        self.db_path = db_path
+        self.shift_of = shift_of
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Streamlit runs each session in its own thread, so share a single
+        # connection and serialise access to it
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create tables on first use"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS attendance ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " unique_id TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " ts TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_attendance_ts ON attendance(ts)"
+            )
+            # Check-in/check-out classification, added after the first release
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(attendance)")]
+            if 'kind' not in columns:
+                self._conn.execute("ALTER TABLE attendance ADD COLUMN kind TEXT")
+            # Day of the shift each punch belongs to; NULL for rows written
+            # before it was tracked
+            if 'day' not in columns:
+                self._conn.execute("ALTER TABLE attendance ADD COLUMN day TEXT")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL)"
+            )
+            # Per-employee, per-day rollup maintained alongside each insert
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS daily_attendance ("
+                " unique_id TEXT NOT NULL,"
+                " day TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " first_in TEXT NOT NULL,"
+                " last_out TEXT NOT NULL,"
+                " punches INTEGER NOT NULL,"
+                " PRIMARY KEY (day, unique_id))"
+            )
+            has_rollup = self._conn.execute(
+                "SELECT 1 FROM meta WHERE key = 'daily_rollup'"
+            ).fetchone()
+            if not has_rollup:
+                # Backfill stores created before the rollup existed
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO daily_attendance"
+                    " SELECT unique_id, substr(ts, 1, 10), MAX(name), MIN(ts), MAX(ts), COUNT(*)"
+                    " FROM attendance GROUP BY unique_id, substr(ts, 1, 10)"
+                )
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('daily_rollup', '1')"
+                )
+
+            has_shift_days = self._conn.execute(
+                "SELECT 1 FROM meta WHERE key = 'shift_days'"
+            ).fetchone()
+            if self.shift_of is not None and not has_shift_days:
+                self._backfill_shift_days()
+
+    def _backfill_shift_days(self):
+        """Regroup older punches by shift day; callers hold the lock and a transaction"""
+        rows = self._conn.execute(
+            "SELECT id, unique_id, ts FROM attendance WHERE day IS NULL"
+        ).fetchall()
+        self._conn.executemany(
+            "UPDATE attendance SET day = ? WHERE id = ?",
+            [(self._day(unique_id, ts), row_id) for row_id, unique_id, ts in rows]
+        )
+        if rows:
+            self._conn.execute("DELETE FROM daily_attendance")
+            self._conn.execute(
+                "INSERT INTO daily_attendance"
+                " SELECT unique_id, day, MAX(name), MIN(ts), MAX(ts), COUNT(*)"
+                " FROM attendance GROUP BY unique_id, day"
+            )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('shift_days', '1')"
+        )
+
+    def _day(self, unique_id, ts):
+        """Shift day (YYYY-MM-DD) of a punch stored as ``ts``"""
+        shift = self.shift_of(unique_id) if self.shift_of is not None else None
+        if shift not in SHIFT_STARTS:
+            return ts[:10]
+        return shift_day(datetime.fromisoformat(ts), shift).isoformat()
+
+    def get_meta(self, key, default=None):
+        """Read a value from the store's metadata table"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        """Write a value to the store's metadata table"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, str(value))
+            )
+
+    def append(self, unique_id, name, timestamp=None, kind=None):
+        """Append a single attendance punch"""
+        self.append_many([(unique_id, name, timestamp or datetime.now(), kind)])
+
+    def append_many(self, records):
+        """Append several (unique_id, name, timestamp[, kind]) punches in one transaction"""
+        rows = self._to_rows(records)
+        if not rows:
+            return 0
+
+        with self._lock, self._conn:
+            self._insert_rows(rows)
+        return len(rows)
+
+    def _to_rows(self, records):
+        """Normalise (unique_id, name, timestamp[, kind]) tuples into table rows"""
+        rows = []
+        for unique_id, name, timestamp, *kind in records:
+            unique_id = str(unique_id)
+            ts = pd.Timestamp(timestamp).isoformat(sep=' ')
+            rows.append((
+                unique_id, str(name), ts, kind[0] if kind else None, self._day(unique_id, ts)
+            ))
+        return rows
+
+    def _insert_rows(self, rows):
+        """Insert rows; callers hold the lock and an open transaction"""
+        self._conn.executemany(
+            "INSERT INTO attendance (unique_id, name, ts, kind, day) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        self._conn.executemany(
+            "INSERT INTO daily_attendance (unique_id, day, name, first_in, last_out, punches)"
+            " VALUES (?1, ?4, ?2, ?3, ?3, 1)"
+            " ON CONFLICT (day, unique_id) DO UPDATE SET"
+            " name = excluded.name,"
+            " first_in = MIN(first_in, excluded.first_in),"
+            " last_out = MAX(last_out, excluded.last_out),"
+            " punches = punches + 1",
+            [(row[0], row[1], row[2], row[4]) for row in rows]
+        )
+
+    def latest_id(self):
+        """Row id of the newest punch (0 when empty); changes whenever any process appends"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM attendance").fetchone()[0]
+
+    def punches_since(self, last_id, limit=100):
+        """Up to ``limit`` of the newest punches recorded after row ``last_id``"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT unique_id, name, ts FROM attendance WHERE id > ?"
+                " ORDER BY id DESC LIMIT ?",
+                self._conn, params=(int(last_id), int(limit))
+            )
+        return self._legacy_frame(df)
+
+    def count(self):
+        """Number of stored punches"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+
+    @staticmethod
+    def _range_clause(column, start, end, unique_ids=None):
+        """SQL filter on an ISO date/timestamp column; ``end`` is inclusive"""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+        if end is not None:
+            clauses.append(f"{column} < ?")
+            params.append((pd.Timestamp(end) + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+        if unique_ids is not None:
+            unique_ids = [str(u) for u in unique_ids]
+            clauses.append(f"unique_id IN ({', '.join('?' * len(unique_ids))})")
+            params.extend(unique_ids)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(self, start=None, end=None, unique_ids=None):
+        """Typed punches between two dates (inclusive).
+
+        Only the requested date range is read, via the timestamp index.
+        IDs and names come back categorical, timestamps as datetime64.
+        """
+        where, params = self._range_clause('ts', start, end, unique_ids)
+        with self._lock:
+            df = pd.read_sql_query(
+                f"SELECT unique_id, name, ts, kind FROM attendance{where} ORDER BY ts",
+                self._conn, params=params
+            )
+        return pd.DataFrame({
+            'Unique ID': df['unique_id'].astype('category'),
+            'Name': df['name'].astype('category'),
+            'Timestamp': pd.to_datetime(df['ts'], format='ISO8601'),
+            'Type': df['kind'].astype('category'),
+        })
+
+    def last_punches(self, since=None):
+        """Latest punch time per employee, from ``since`` (a date) onwards"""
+        where, params = self._range_clause('day', since, None)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT unique_id, MAX(last_out) FROM daily_attendance{where} GROUP BY unique_id",
+                params
+            ).fetchall()
+        return {unique_id: pd.Timestamp(ts).to_pydatetime() for unique_id, ts in rows}
+
+    def daily_aggregates(self, start=None, end=None, unique_ids=None):
+        """Per-employee, per-shift-day first-in, last-out and punch counts"""
+        where, params = self._range_clause('day', start, end, unique_ids)
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT unique_id, name, day, first_in, last_out, punches"
+                f" FROM daily_attendance{where} ORDER BY day, unique_id",
+                self._conn, params=params
+            )
+        return pd.DataFrame({
+            'Unique ID': df['unique_id'].astype('category'),
+            'Name': df['name'].astype('category'),
+            'Date': pd.to_datetime(df['day'], format='%Y-%m-%d'),
+            'First In': pd.to_datetime(df['first_in'], format='ISO8601'),
+            'Last Out': pd.to_datetime(df['last_out'], format='ISO8601'),
+            'Punches': df['punches'].astype('int32'),
+        })
+
+    def date_bounds(self):
+        """Earliest and latest punch dates, or (None, None) when empty"""
+        with self._lock:
+            first, last = self._conn.execute(
+                "SELECT MIN(day), MAX(day) FROM daily_attendance"
+            ).fetchone()
+        if first is None:
+            return None, None
+        return pd.Timestamp(first).date(), pd.Timestamp(last).date()
+
+    def to_dataframe(self):
+        """Load the attendance log in the legacy DataFrame layout"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT unique_id, name, ts FROM attendance ORDER BY id",
+                self._conn
+            )
+        return self._legacy_frame(df)
+
+    def iter_chunks(self, start=None, end=None, unique_ids=None, chunk_size=50000):
+        """Yield the filtered log in legacy-layout DataFrames of ``chunk_size`` rows.
+
+        Reads through a separate read-only connection, so the export sees
+        one consistent snapshot without blocking punches being recorded.
+        """
+        where, params = self._range_clause('ts', start, end, unique_ids)
+        conn = sqlite3.connect(f"file:{os.path.abspath(self.db_path)}?mode=ro", uri=True)
+        try:
+            for df in pd.read_sql_query(
+                f"SELECT unique_id, name, ts FROM attendance{where} ORDER BY ts",
+                conn, params=params, chunksize=chunk_size
+            ):
+                yield self._legacy_frame(df)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _legacy_frame(df):
+        """Raw (unique_id, name, ts) rows in the legacy column layout"""
+        # ts is stored as 'YYYY-MM-DD HH:MM:SS[.ffffff]', so Date and Time
+        # are plain slices rather than per-row strftime calls
+        return pd.DataFrame({
+            'Unique ID': df['unique_id'],
+            'Name': df['name'],
+            'Date': df['ts'].str.slice(0, 10),
+            'Time': df['ts'].str.slice(11, 19),
+            'Timestamp': pd.to_datetime(df['ts'], format='ISO8601')
+        }, columns=ATTENDANCE_COLUMNS)
+
+    def migrate_from_pickle(self, pickle_path='data/attendance.pkl'):
+        """One-time import of the legacy attendance.pkl DataFrame.
+
+        Returns the number of imported rows; a marker in the meta table makes
+        repeated calls a no-op.
+        """
+        if self.get_meta('migrated_pickle') or not os.path.exists(pickle_path):
+            return 0
+
+        with open(pickle_path, 'rb') as f:
+            legacy = pickle.load(f)
+
+        records = []
+        for _, row in legacy.iterrows():
+            timestamp = row.get('Timestamp')
+            if pd.isna(timestamp):
+                timestamp = f"{row['Date']} {row['Time']}"
+            records.append((row['Unique ID'], row['Name'], timestamp))
+
+        # Check the marker, import and set it in one write transaction, so
+        # the app and the API starting together can't both import the pickle
+        rows = self._to_rows(records)
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            if self._conn.execute(
+                "SELECT 1 FROM meta WHERE key = 'migrated_pickle'"
+            ).fetchone():
+                return 0
+            self._insert_rows(rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                ('migrated_pickle', os.path.abspath(pickle_path))
+            )
+        return len(rows)
+
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import qr_payload  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def qr_secret(monkeypatch):
+    """Sign with a fixed key instead of creating data/qr_secret.key"""
+    monkeypatch.setenv(qr_payload.SECRET_ENV_VAR, 'test-secret')
+    monkeypatch.setattr(qr_payload, '_secret', None)
@@ -0,0 +1,47 @@
+from datetime import date, datetime
+
+import pytest
+
+from attendance_ingest import CHECK_IN, CHECK_OUT, AttendanceIngestor, shift_day
+from storage import AttendanceStore
+
+
+SHIFTS = {'AT-001': 'Night', 'AT-002': None, 'AT-003': 'Weekend'}
+
+
+@pytest.fixture
+def ingestor(tmp_path):
+    store = AttendanceStore(str(tmp_path / 'attendance.db'))
+    yield AttendanceIngestor(store, shift_of=SHIFTS.get, window=60)
+    store.close()
+
+
+@pytest.mark.parametrize('shift', [None, 'Weekend'])
+def test_unknown_shift_uses_calendar_day(shift):
+    assert shift_day(datetime(2026, 1, 1, 21, 0), shift) == date(2026, 1, 1)
+    assert shift_day(datetime(2026, 1, 1, 0, 30), shift) == date(2026, 1, 1)
+
+
+def test_night_shift_spans_midnight():
+    assert shift_day(datetime(2026, 1, 1, 21, 45), 'Night') == date(2026, 1, 1)
+    assert shift_day(datetime(2026, 1, 2, 6, 10), 'Night') == date(2026, 1, 1)
+    assert shift_day(datetime(2026, 1, 2, 21, 45), 'Night') == date(2026, 1, 2)
+
+
+@pytest.mark.parametrize('unique_id', ['AT-002', 'AT-003'])
+def test_unknown_shift_evening_punches_share_a_day(ingestor, unique_id):
+    punches = ingestor.submit_many([
+        (unique_id, 'Jane Doe', datetime(2026, 1, 1, 19, 0)),
+        (unique_id, 'Jane Doe', datetime(2026, 1, 1, 21, 0)),
+        (unique_id, 'Jane Doe', datetime(2026, 1, 2, 9, 0)),
+    ])
+    assert [punch.kind for punch in punches] == [CHECK_IN, CHECK_OUT, CHECK_IN]
+
+
+def test_night_shift_check_out_after_midnight(ingestor):
+    punches = ingestor.submit_many([
+        ('AT-001', 'Jane Doe', datetime(2026, 1, 1, 21, 50)),
+        ('AT-001', 'Jane Doe', datetime(2026, 1, 2, 6, 5)),
+        ('AT-001', 'Jane Doe', datetime(2026, 1, 2, 21, 55)),
+    ])
+    assert [punch.kind for punch in punches] == [CHECK_IN, CHECK_OUT, CHECK_IN]
@@ -0,0 +1,89 @@
+import io
+import multiprocessing
+import os
+
+import pytest
+import qrcode
+from PIL import Image
+
+import card_renderer
+import qr_decoder
+import qr_payload
+from conftest import REPO_ROOT
+
+
+EMPLOYEE = {
+    'Unique ID': 'AT-042', 'Name': 'Jane Doe', 'CNIC': '35202-1234567-1', 'Age': 30,
+    'Role': 'Data Analyst', 'City': 'Lahore', 'Shift': 'Night', 'Photo': None,
+}
+
+
+def render_card(employee=EMPLOYEE):
+    logo_path = os.path.join(REPO_ROOT, card_renderer.DEFAULT_LOGO_PATH)
+    card = card_renderer.create_employee_card(employee, logo_path)
+    return card_renderer.encode_png(card)
+
+
+def qr_png(text):
+    buffer = io.BytesIO()
+    qrcode.make(text).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def blank_png():
+    buffer = io.BytesIO()
+    Image.new('RGB', (200, 200), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def scan(data):
+    return qr_decoder.extract_unique_id(qr_decoder.decode_image(io.BytesIO(data)))
+
+
+def test_rendered_card_round_trip():
+    assert scan(render_card()) == 'AT-042'
+
+
+@pytest.mark.parametrize('angle', [90, 180, 270, 30])
+def test_rotated_card(angle):
+    card = Image.open(io.BytesIO(render_card()))
+    rotated = card.rotate(angle, expand=True, fillcolor='white')
+    assert qr_decoder.extract_unique_id(qr_decoder.decode_image(rotated)) == 'AT-042'
+
+
+def test_legacy_payload():
+    legacy = "Unique ID: AT-007\nName: Jane Doe\nRole: Data Analyst"
+    assert scan(qr_png(legacy)) == 'AT-007'
+
+
+def test_legacy_payload_can_be_refused():
+    with pytest.raises(qr_payload.InvalidPayload):
+        qr_payload.parse_payload("Unique ID: AT-007", allow_legacy=False)
+
+
+def test_forged_signature_is_rejected():
+    genuine = qr_payload.encode_payload('AT-042')
+    forged = genuine.replace('AT-042', 'AT-001')
+    assert scan(qr_png(genuine)) == 'AT-042'
+    with pytest.raises(qr_decoder.QRDecodeError, match="signature"):
+        scan(qr_png(forged))
+
+
+def test_signature_from_another_key_is_rejected(monkeypatch):
+    payload = qr_payload.encode_payload('AT-042')
+    monkeypatch.setenv(qr_payload.SECRET_ENV_VAR, 'another-secret')
+    monkeypatch.setattr(qr_payload, '_secret', None)
+    with pytest.raises(qr_decoder.QRDecodeError, match="signature"):
+        scan(qr_png(payload))
+
+
+def test_decode_many_in_spawned_workers():
+    card = render_card()
+    items = [(f"card_{i}.png", card) for i in range(qr_decoder.PARALLEL_THRESHOLD)]
+    items.append(('blank.png', blank_png()))
+    results = qr_decoder.decode_many(
+        items, workers=2, mp_context=multiprocessing.get_context('spawn')
+    )
+    assert [name for name, _, _ in results] == [name for name, _ in items]
+    assert all(unique_id == 'AT-042' and error is None for _, unique_id, error in results[:-1])
+    assert results[-1][1] is None and results[-1][2]
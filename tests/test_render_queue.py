@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from card_cache import RenderedCardCache
+from render_queue import DONE, FAILED, QUEUED, RUNNING, RenderQueue
+
+
+EMPLOYEE = {
+    'Unique ID': 'AT-042', 'Name': 'Jane Doe', 'CNIC': '35202-1234567-1', 'Age': 30,
+    'Role': 'Data Analyst', 'City': 'Lahore', 'Shift': 'Night', 'Photo': None,
+}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = RenderQueue(
+        RenderedCardCache(str(tmp_path / 'cache')), str(tmp_path / 'jobs.db'),
+        workers=1, max_attempts=3, retry_delay=0
+    )
+    yield queue
+    queue.close()
+
+
+def settle(queue, job_id, timeout=30):
+    """Wait until a job is done or failed and return its details"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.status(job_id)
+        if job['status'] not in (QUEUED, RUNNING):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not settle")
+
+
+def test_render_and_resubmit_reuses_job(queue):
+    job_id = queue.submit(EMPLOYEE)
+    assert settle(queue, job_id)['status'] == DONE
+    assert queue.result(job_id).startswith(b'\x89PNG')
+    assert queue.submit(EMPLOYEE) == job_id
+    assert queue.stats()[DONE] == 1
+
+
+def test_resubmitting_failed_card_does_not_requeue_it(queue):
+    broken = {k: v for k, v in EMPLOYEE.items() if k != 'City'}
+    job_id = queue.submit(broken)
+    job = settle(queue, job_id)
+    assert job['status'] == FAILED
+    assert job['attempts'] == 3
+
+    assert queue.submit(broken) == job_id
+    job = queue.status(job_id)
+    assert job['status'] == FAILED
+    assert job['attempts'] == 3
+
+    assert queue.retry_failed() == 1
+    assert settle(queue, job_id)['status'] == FAILED
@@ -0,0 +1,73 @@
+import pickle
+import threading
+
+import pandas as pd
+import pytest
+
+from storage import ATTENDANCE_COLUMNS, AttendanceStore, DuplicateEmployee, EmployeeStore
+
+
+def employee(name, cnic):
+    return {'Name': name, 'CNIC': cnic, 'Age': 30, 'Role': 'Data Analyst',
+            'City': 'Lahore', 'Shift': 'Morning', 'Photo': None}
+
+
+def saved_ids(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)['Unique ID'].tolist()
+
+
+@pytest.mark.parametrize('existing', [False, True])
+def test_add_many_saves_nothing_on_clash(tmp_path, existing):
+    path = str(tmp_path / 'employees.pkl')
+    store = EmployeeStore(path)
+    if existing:
+        store.add(employee('First', '11111-1111111-1'))
+
+    with pytest.raises(DuplicateEmployee):
+        store.add_many([employee('A', '35202-1234567-1'), employee('B', '3520212345671')])
+    assert len(store) == int(existing)
+    assert store.get_by_cnic('35202-1234567-1') is None
+
+    added = store.add(employee('C', '42101-7654321-3'))
+    assert store.get_by_cnic('35202-1234567-1') is None
+    assert saved_ids(path) == (['AT-001'] if existing else []) + [added['Unique ID']]
+
+
+def test_add_assigns_ids(tmp_path):
+    store = EmployeeStore(str(tmp_path / 'employees.pkl'))
+    first = store.add(employee('A', '1'))
+    second, third = store.add_many([employee('B', '2'), employee('C', '3')])
+    assert [first['Unique ID'], second['Unique ID'], third['Unique ID']] == ['AT-001', 'AT-002', 'AT-003']
+
+
+def test_concurrent_pickle_migration_imports_once(tmp_path):
+    legacy = pd.DataFrame({
+        'Unique ID': [f"AT-{i:03d}" for i in range(200)],
+        'Name': 'Jane Doe',
+        'Date': '2025-01-02',
+        'Time': '09:00:00',
+        'Timestamp': [f"2025-01-02 09:{i // 60:02d}:{i % 60:02d}" for i in range(200)],
+    }, columns=ATTENDANCE_COLUMNS)
+    pickle_path = str(tmp_path / 'attendance.pkl')
+    legacy.to_pickle(pickle_path)
+
+    db_path = str(tmp_path / 'attendance.db')
+    stores = [AttendanceStore(db_path) for _ in range(4)]
+    barrier = threading.Barrier(len(stores))
+    imported = []
+
+    def migrate(store):
+        barrier.wait()
+        imported.append(store.migrate_from_pickle(pickle_path))
+
+    threads = [threading.Thread(target=migrate, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(imported) == [0, 0, 0, len(legacy)]
+    assert stores[0].count() == len(legacy)
+    for store in stores:
+        store.close()